@@ -0,0 +1,74 @@
+"""
+Acumuladores ponderados por tiempo para métricas de la simulación.
+Se actualizan en cada cambio de estado y usan memoria O(1) (o O(niveles)
+en el histograma), sin guardar ni recorrer el log de eventos.
+"""
+
+class HistogramaTiempo:
+    """
+    Histograma ponderado por tiempo de un nivel entero (p. ej. ocupación de un
+    buffer): tiempos[nivel] = minutos acumulados en ese nivel.
+    """
+
+    def __init__(self, t0=0.0, nivel=0):
+        self.t = t0
+        self.nivel = nivel
+        self.maximo = nivel
+        self.tiempos = {}
+
+    def actualizar(self, t, nivel):
+        """Registra que desde `t` el nivel pasa a ser `nivel`."""
+        if t > self.t:
+            self.tiempos[self.nivel] = self.tiempos.get(self.nivel, 0.0) + (t - self.t)
+            self.t = t
+        self.nivel = nivel
+        if nivel > self.maximo:
+            self.maximo = nivel
+
+    def cerrar(self, t):
+        """Acumula el tramo final hasta `t` (fin de la corrida)."""
+        self.actualizar(t, self.nivel)
+
+    def total(self):
+        return sum(self.tiempos.values())
+
+    def promedio(self):
+        total = self.total()
+        if total <= 0:
+            return 0.0
+        return sum(n * dt for n, dt in self.tiempos.items()) / total
+
+    def distribucion(self):
+        """{nivel: fracción del tiempo}, ordenado por nivel."""
+        total = self.total()
+        if total <= 0:
+            return {}
+        return {n: self.tiempos[n] / total for n in sorted(self.tiempos)}
+
+class AcumuladorTiempo:
+    """
+    Promedio y máximo ponderados por tiempo de un nivel (usuarios, cola, WIP).
+    Memoria O(1): solo guarda el nivel actual, el área acumulada y el máximo.
+    """
+
+    def __init__(self, t0=0.0, nivel=0):
+        self.t0 = t0
+        self.t = t0
+        self.nivel = nivel
+        self.area = 0.0
+        self.maximo = nivel
+
+    def actualizar(self, t, nivel):
+        """Registra que desde `t` el nivel pasa a ser `nivel`."""
+        self.area += self.nivel * (t - self.t)
+        self.t = t
+        self.nivel = nivel
+        if nivel > self.maximo:
+            self.maximo = nivel
+
+    def cerrar(self, t):
+        self.actualizar(t, self.nivel)
+
+    def promedio(self):
+        duracion = self.t - self.t0
+        return self.area / duracion if duracion > 0 else 0.0
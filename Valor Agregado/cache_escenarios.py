@@ -0,0 +1,177 @@
+"""
+Caché de escenarios de fallas (salida de simulate_available) para compartir
+entre réplicas de producción y celdas de un barrido.
+Cada escenario se identifica por (parámetros de falla, semilla, horizonte),
+se guarda en el formato columnar binario de cargar_datos y se abre con mmap.
+Réplicas con la misma semilla reutilizan el mismo escenario (números
+aleatorios comunes entre configuraciones). Desalojo LRU por cantidad y tamaño.
+"""
+
+import hashlib
+import json
+import os
+import random
+import shutil
+import uuid
+
+from cargar_datos import TablaColumnar, desde_segundos, leer_meta
+from exportar_fallas import exportar_fallas_columnar
+
+# ---------------------------
+# CONFIGURACIÓN
+# ---------------------------
+DIRECTORIO_ESCENARIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_escenarios")
+MAX_ESCENARIOS = 64
+MAX_BYTES = 256 * 1024 * 1024
+
+# Escenarios ya abiertos en este proceso: clave -> TablaColumnar. Este
+# proceso no los desaloja (otras partes del barrido pueden seguir usándolos).
+_ABIERTOS = {}
+
+# ---------------------------
+# CLAVE DEL ESCENARIO
+# ---------------------------
+def parametros_falla():
+    """Todo lo que determina un escenario además de semilla y horizonte."""
+    import simulate_available as sa
+
+    return {
+        "probabilidad": sa.PROBABILIDAD_FALLA_POR_ESTACION,
+        "reparacion_horas": sa.TIEMPO_REPARACION_POR_ESTACION,
+        "desviacion": sa.DESVIACION_REPARACION,
+        "probabilidad_grave": sa.PROBABILIDAD_FALLA_GRAVE_POR_ESTACION,
+        "factor_grave": sa.FACTOR_FALLA_GRAVE,
+        "jornada": [sa.HORA_INICIO_JORNADA, sa.HORA_FIN_JORNADA],
+        "dias_no_habiles": sa.DIAS_NO_HABILES,
+        "feriados": sa.DIAS_FERIADOS,
+        "turnos": sa.PATRON_TURNOS,
+        "turnos_por_estacion": sa.PATRON_TURNOS_POR_ESTACION,
+    }
+
+def clave_escenario(parametros, semilla, fecha_inicio, fecha_fin):
+    contenido = json.dumps(
+        {"parametros": parametros, "semilla": semilla,
+         "horizonte": [fecha_inicio.isoformat(), fecha_fin.isoformat()]},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()[:24]
+
+# ---------------------------
+# GENERACIÓN Y LRU
+# ---------------------------
+def _generar(semilla, fecha_inicio, fecha_fin):
+    """Genera las fallas con `semilla` sin alterar el estado global de random."""
+    import simulate_available as sa
+
+    estado = random.getstate()
+    random.seed(semilla)
+    try:
+        return sa.simular_todas_fallas(fecha_inicio, fecha_fin)
+    finally:
+        random.setstate(estado)
+
+def _tamano(directorio):
+    return sum(e.stat().st_size for e in os.scandir(directorio) if e.is_file())
+
+def desalojar(directorio=DIRECTORIO_ESCENARIOS, max_escenarios=None, max_bytes=None, conservar=()):
+    """
+    Borra los escenarios usados hace más tiempo hasta cumplir los límites.
+    Nunca borra los de `conservar` (p. ej. el recién escrito o los pedidos en
+    la misma llamada) ni los abiertos por este proceso; sí cuentan para los
+    límites. Las tablas abiertas en otros procesos mapean todas sus columnas
+    al crearse, así que en POSIX siguen siendo válidas tras el borrado.
+    """
+    if not os.path.isdir(directorio):
+        return
+    max_escenarios = MAX_ESCENARIOS if max_escenarios is None else max_escenarios
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    protegidas = set(conservar) | set(_ABIERTOS)
+    entradas = []
+    n_protegidas = total = 0
+    for e in os.scandir(directorio):
+        meta = os.path.join(e.path, "meta.json")
+        if not (e.is_dir() and os.path.exists(meta)):
+            continue
+        tam = _tamano(e.path)
+        total += tam
+        if e.name in protegidas:
+            n_protegidas += 1
+        else:
+            entradas.append((os.stat(meta).st_mtime, e.name, tam))
+    entradas.sort()
+    while entradas and (len(entradas) + n_protegidas > max_escenarios or total > max_bytes):
+        _, nombre, tam = entradas.pop(0)
+        shutil.rmtree(os.path.join(directorio, nombre), ignore_errors=True)
+        total -= tam
+
+def obtener_escenario(semilla, fecha_inicio=None, fecha_fin=None, directorio=DIRECTORIO_ESCENARIOS,
+                      conservar=()):
+    """
+    Devuelve el escenario como TablaColumnar (columnas estacion, inicio, fin,
+    duracion_horas, tipo_falla; índice por estación y orden por inicio).
+    Lo genera y guarda si no está en caché; si está, solo lo mapea.
+    `conservar`: claves que el desalojo de esta llamada no debe borrar.
+    """
+    import simulate_available as sa
+
+    fecha_inicio = fecha_inicio or sa.FECHA_INICIO
+    fecha_fin = fecha_fin or sa.FECHA_FIN
+    clave = clave_escenario(parametros_falla(), semilla, fecha_inicio, fecha_fin)
+    destino = os.path.join(directorio, clave)
+
+    tabla = _ABIERTOS.get(clave)
+    if tabla is not None and os.path.isdir(destino):
+        os.utime(os.path.join(destino, "meta.json"))
+        return tabla
+
+    # Otro proceso puede desalojar el escenario entre leer el meta y mapear
+    # las columnas: en ese caso se vuelve a generar
+    for _ in range(3):
+        meta = leer_meta(destino)
+        if meta is None:
+            fallas = _generar(semilla, fecha_inicio, fecha_fin)
+            # Se escribe en un temporal y se renombra: otro proceso puede estar
+            # generando el mismo escenario a la vez
+            temporal = os.path.join(directorio, f".tmp-{clave}-{uuid.uuid4().hex[:8]}")
+            exportar_fallas_columnar(fallas, temporal)
+            try:
+                os.rename(temporal, destino)
+            except OSError:
+                shutil.rmtree(temporal, ignore_errors=True)
+            desalojar(directorio, conservar={clave, *conservar})
+            meta = leer_meta(destino)
+            if meta is None:
+                continue
+        try:
+            os.utime(os.path.join(destino, "meta.json"))
+            tabla = _ABIERTOS[clave] = TablaColumnar(destino, meta)
+            return tabla
+        except FileNotFoundError:
+            continue
+    raise RuntimeError(f"No se pudo abrir el escenario {clave} en {directorio}")
+
+def escenarios_replicas(n, semilla_base=0, fecha_inicio=None, fecha_fin=None,
+                        directorio=DIRECTORIO_ESCENARIOS):
+    """Escenarios para n réplicas; la réplica j usa siempre semilla_base + j."""
+    import simulate_available as sa
+
+    fecha_inicio = fecha_inicio or sa.FECHA_INICIO
+    fecha_fin = fecha_fin or sa.FECHA_FIN
+    parametros = parametros_falla()
+    # Ningún escenario de esta llamada desaloja a otro de la misma llamada
+    claves = {clave_escenario(parametros, semilla_base + j, fecha_inicio, fecha_fin) for j in range(n)}
+    return [obtener_escenario(semilla_base + j, fecha_inicio, fecha_fin, directorio, conservar=claves)
+            for j in range(n)]
+
+# ---------------------------
+# CONSULTAS
+# ---------------------------
+def paradas_estacion(tabla, estacion):
+    """Lista ordenada de (inicio, fin) datetimes de las paradas de una estación."""
+    inicio, fin = tabla.columna("inicio"), tabla.columna("fin")
+    filas = sorted(tabla.indices_por("estacion", estacion), key=inicio.__getitem__)
+    return [(desde_segundos(inicio[i]), desde_segundos(fin[i])) for i in filas]
+
+def paradas_por_estacion(tabla):
+    """{estacion: [(inicio, fin), ...]} para todas las estaciones del escenario."""
+    return {est: paradas_estacion(tabla, est) for est in tabla.categorias("estacion")}
@@ -0,0 +1,269 @@
+"""
+Calendario de turnos para los simuladores.
+Soporta varios turnos por día (incluidos turnos que cruzan la medianoche),
+descansos, horas extra y días no hábiles. Se precalcula una tabla de
+intervalos laborables con minutos acumulados, así sumar tiempo de trabajo o
+convertir minutos laborables a fecha cuesta O(log n) vía bisect.
+"""
+
+import array
+import bisect
+from datetime import datetime, timedelta
+
+# ---------------------------
+# PATRONES DE TURNO
+# ---------------------------
+# Horas del día como números (6.5 = 06:30). Un turno con fin <= inicio
+# termina al día siguiente. Los descansos se restan todos los días.
+# "extra_por_dia_semana": horas extra fijas por día de la semana (0=lunes),
+# se trabajan aunque ese día sea no hábil.
+PATRONES_TURNO = {
+    "1_turno": {
+        "turnos": [(8, 17)],
+        "descansos": [],
+    },
+    "2_turnos": {
+        "turnos": [(6, 14), (14, 22)],
+        "descansos": [(10, 10.25), (18, 18.25)],
+    },
+    "3_turnos": {
+        "turnos": [(6, 14), (14, 22), (22, 6)],
+        "descansos": [(10, 10.25), (18, 18.25), (2, 2.25)],
+    },
+    "2_turnos_sabado": {
+        "turnos": [(6, 14), (14, 22)],
+        "descansos": [(10, 10.25), (18, 18.25)],
+        "extra_por_dia_semana": {5: [(8, 12)]},
+    },
+}
+
+HORIZONTE_INICIAL_DIAS = 400   # días precalculados al crear el calendario
+MAX_CALENDARIOS = 32           # configuraciones guardadas por calendario_compartido
+
+def patron_jornada(hora_inicio, hora_fin):
+    """Patrón de un único turno (equivale al horario HORA_INICIO..HORA_FIN)."""
+    return {"turnos": [(hora_inicio, hora_fin)], "descansos": []}
+
+def congelar(valor):
+    """Convierte dicts/listas/sets anidados en tuplas: sirve como clave de caché de una configuración."""
+    if isinstance(valor, dict):
+        return tuple(sorted((k, congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(v) for v in valor)
+    if isinstance(valor, (set, frozenset)):
+        return tuple(sorted(valor))
+    return valor
+
+def obtener_patron(patron):
+    """Acepta un nombre de PATRONES_TURNO o un dict de patrón."""
+    if isinstance(patron, str):
+        if patron not in PATRONES_TURNO:
+            raise ValueError(f"Patrón de turnos desconocido: {patron}")
+        return PATRONES_TURNO[patron]
+    return patron
+
+# ---------------------------
+# OPERACIONES CON INTERVALOS
+# ---------------------------
+def _unir(intervalos):
+    """Ordena y fusiona intervalos [a, b) solapados o contiguos."""
+    salida = []
+    for a, b in sorted(intervalos):
+        if b <= a:
+            continue
+        if salida and a <= salida[-1][1]:
+            if b > salida[-1][1]:
+                salida[-1][1] = b
+        else:
+            salida.append([a, b])
+    return salida
+
+def _restar(intervalos, huecos):
+    """Resta los huecos (ya fusionados) a los intervalos (ya fusionados)."""
+    salida = []
+    j = 0
+    for a, b in intervalos:
+        while j < len(huecos) and huecos[j][1] <= a:
+            j += 1
+        k = j
+        while k < len(huecos) and huecos[k][0] < b:
+            ha, hb = huecos[k]
+            if ha > a:
+                salida.append([a, ha])
+            a = max(a, hb)
+            k += 1
+        if a < b:
+            salida.append([a, b])
+    return salida
+
+# ---------------------------
+# CALENDARIO
+# ---------------------------
+class CalendarioTurnos:
+    """
+    Tabla de intervalos laborables en minutos desde `origen`.
+      inicios[i], fines[i]: límites del intervalo i
+      acumulado[i]: minutos laborables antes del intervalo i
+    La tabla se extiende sola si una consulta sale del horizonte calculado.
+    """
+
+    def __init__(self, origen, patron="1_turno", dias_no_habiles=(),
+                 dias_semana_no_habiles=(), horas_extra=(), horizonte_dias=HORIZONTE_INICIAL_DIAS):
+        self.origen = origen
+        self.patron = obtener_patron(patron)
+        self.dias_no_habiles = set(dias_no_habiles)
+        self.dias_semana_no_habiles = set(dias_semana_no_habiles)
+        self.horas_extra = list(horas_extra)   # [(datetime_inicio, datetime_fin)]
+        self._construir(horizonte_dias)
+
+    # ---- construcción ----
+    def _minutos(self, dt):
+        return (dt - self.origen) / timedelta(minutes=1)
+
+    def es_dia_habil(self, d):
+        return d not in self.dias_no_habiles and d.weekday() not in self.dias_semana_no_habiles
+
+    def _fin_horizonte(self, dias):
+        dia0 = self.origen.date()
+        return self._minutos(datetime(dia0.year, dia0.month, dia0.day)) + (dias + 1) * 1440
+
+    def _intervalos(self, dias):
+        """Intervalos laborables [a, b) en minutos desde `origen`, hasta `dias` días después."""
+        dia0 = self.origen.date()
+        base0 = datetime(dia0.year, dia0.month, dia0.day)
+        offset0 = self._minutos(base0)
+        turnos = [(a * 60, b * 60 if b > a else b * 60 + 1440) for a, b in self.patron["turnos"]]
+        descansos = [(a * 60, b * 60 if b > a else b * 60 + 1440) for a, b in self.patron.get("descansos", [])]
+        extra_semana = self.patron.get("extra_por_dia_semana", {})
+
+        trabajo, huecos, extra = [], [], []
+        # Se incluye el día anterior al origen por los turnos que cruzan la medianoche
+        for n in range(-1, dias + 1):
+            d = dia0 + timedelta(days=n)
+            base = offset0 + n * 1440
+            if self.es_dia_habil(d):
+                trabajo.extend((base + a, base + b) for a, b in turnos)
+            huecos.extend((base + a, base + b) for a, b in descansos)
+            extra.extend((base + a * 60, base + b * 60) for a, b in extra_semana.get(d.weekday(), []))
+        extra.extend((self._minutos(a), self._minutos(b)) for a, b in self.horas_extra)
+
+        intervalos = _restar(_unir(trabajo), _unir(huecos))
+        intervalos = _unir([tuple(i) for i in intervalos] + extra)
+        fin_tabla = self._fin_horizonte(dias)
+        return [(max(a, 0), min(b, fin_tabla)) for a, b in intervalos if b > 0 and a < fin_tabla]
+
+    def _construir(self, dias):
+        intervalos = self._intervalos(dias)
+        if not intervalos:
+            raise ValueError("El patrón de turnos no tiene tiempo laborable")
+
+        self.dias = dias
+        self.fin_tabla = self._fin_horizonte(dias)
+        self.inicios = array.array("d", (a for a, _ in intervalos))
+        self.fines = array.array("d", (b for _, b in intervalos))
+        self.acumulado = array.array("d", [0.0])
+        for a, b in intervalos[:-1]:
+            self.acumulado.append(self.acumulado[-1] + (b - a))
+        self.total = self.acumulado[-1] + (self.fines[-1] - self.inicios[-1])
+
+    def _cubrir_instante(self, t):
+        while t >= self.fin_tabla:
+            self._construir(self.dias * 2)
+
+    def _cubrir_trabajo(self, w):
+        while w > self.total:
+            self._construir(self.dias * 2)
+
+    # ---- consultas ----
+    def trabajo_hasta(self, dt):
+        """Minutos laborables entre `origen` y `dt`."""
+        t = self._minutos(dt)
+        self._cubrir_instante(t)
+        i = bisect.bisect_right(self.inicios, t) - 1
+        if i < 0:
+            return 0.0
+        return self.acumulado[i] + min(t, self.fines[i]) - self.inicios[i]
+
+    def a_fecha(self, minutos_trabajo):
+        """Fecha real en la que se cumplen `minutos_trabajo` laborables desde `origen`."""
+        self._cubrir_trabajo(minutos_trabajo)
+        i = max(0, bisect.bisect_left(self.acumulado, minutos_trabajo) - 1)
+        t = self.inicios[i] + (minutos_trabajo - self.acumulado[i])
+        return self.origen + timedelta(minutes=t)
+
+    def ajustar(self, dt):
+        """Devuelve `dt` si es laborable; si no, el inicio del siguiente intervalo laborable."""
+        t = self._minutos(dt)
+        self._cubrir_instante(t)
+        i = bisect.bisect_right(self.fines, t)
+        if i < len(self.inicios) and self.inicios[i] > t:
+            return self.origen + timedelta(minutes=self.inicios[i])
+        return dt
+
+    def sumar_trabajo(self, dt, minutos):
+        """Fecha en la que termina un trabajo de `minutos` laborables que empieza en `dt`."""
+        if minutos <= 0:
+            return self.ajustar(dt)
+        return self.a_fecha(self.trabajo_hasta(dt) + minutos)
+
+    def es_laborable(self, dt):
+        t = self._minutos(dt)
+        self._cubrir_instante(t)
+        i = bisect.bisect_right(self.inicios, t) - 1
+        return i >= 0 and t < self.fines[i]
+
+    def minutos_por_dia(self, d):
+        """Minutos laborables de la fecha `d` (obj date)."""
+        inicio = datetime(d.year, d.month, d.day)
+        return self.trabajo_hasta(inicio + timedelta(days=1)) - self.trabajo_hasta(inicio)
+
+class CalendarioUnion(CalendarioTurnos):
+    """
+    Tiempo laborable de al menos uno de varios calendarios con el mismo origen.
+    Sirve de eje de tiempo común cuando cada estación tiene su propio turno:
+    ningún tramo en que trabaje alguna estación queda fuera del eje.
+    """
+
+    def __init__(self, calendarios, horizonte_dias=HORIZONTE_INICIAL_DIAS):
+        self.calendarios = list(calendarios)
+        self.origen = self.calendarios[0].origen
+        self._construir(horizonte_dias)
+
+    def _intervalos(self, dias):
+        return [tuple(i) for i in _unir([i for c in self.calendarios for i in c._intervalos(dias)])]
+
+# ---------------------------
+# CALENDARIOS COMPARTIDOS
+# ---------------------------
+_CALENDARIOS = {}
+
+def _guardar(clave, crear):
+    calendario = _CALENDARIOS.get(clave)
+    if calendario is None:
+        if len(_CALENDARIOS) >= MAX_CALENDARIOS:
+            del _CALENDARIOS[next(iter(_CALENDARIOS))]
+        calendario = _CALENDARIOS[clave] = crear()
+    return calendario
+
+def calendario_compartido(origen, patron, dias_no_habiles=(), dias_semana_no_habiles=()):
+    """
+    CalendarioTurnos reutilizado entre llamadas con la misma configuración.
+    La clave incluye todos los argumentos, así un barrido que cambia patrón,
+    origen o feriados en el mismo proceso obtiene un calendario nuevo.
+    Se guardan hasta MAX_CALENDARIOS; al pasarse se descarta el más antiguo.
+    """
+    clave = (origen, congelar(patron), congelar(set(dias_no_habiles)),
+             congelar(set(dias_semana_no_habiles)))
+    return _guardar(clave, lambda: CalendarioTurnos(
+        origen, patron, dias_no_habiles=dias_no_habiles,
+        dias_semana_no_habiles=dias_semana_no_habiles
+    ))
+
+def union_compartida(origen, patrones, dias_no_habiles=(), dias_semana_no_habiles=()):
+    """CalendarioUnion de varios patrones, reutilizado igual que calendario_compartido."""
+    patrones = sorted({congelar(p): p for p in patrones}.items(), key=lambda kv: repr(kv[0]))
+    clave = ("union", origen, tuple(k for k, _ in patrones), congelar(set(dias_no_habiles)),
+             congelar(set(dias_semana_no_habiles)))
+    return _guardar(clave, lambda: CalendarioUnion(
+        [calendario_compartido(origen, p, dias_no_habiles, dias_semana_no_habiles) for _, p in patrones]
+    ))
@@ -0,0 +1,516 @@
+"""
+Cargador rápido de los CSV de reporte (res_product.csv y fallas_estaciones.csv).
+Parsea por bloques a columnas tipadas y guarda una caché columnar en disco
+(un archivo binario por columna) que se abre con mmap, de modo que las
+consultas repetidas no vuelven a pagar el costo del parseo.
+La caché se invalida cuando cambia el mtime o el tamaño del CSV de origen;
+cada reconstrucción va a un directorio de versión nuevo, así nunca se
+reemplazan archivos que otra tabla tenga mapeados (en Windows eso falla).
+"""
+
+import array
+import bisect
+import csv
+import json
+import mmap
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+
+# ---------------------------
+# CONFIGURACIÓN
+# ---------------------------
+DIRECTORIO_CACHE = ".cache_datos"
+TAMANO_BLOQUE = 50_000   # filas parseadas por bloque
+VERSION_CACHE = 2
+
+# Tipos de columna -> código de array.array
+TIPOS = {
+    "fecha": "q",    # segundos desde EPOCA
+    "real": "d",
+    "entero": "q",
+    "cat": "i",      # código en el diccionario de categorías
+    "texto": "B",    # texto de ancho fijo (esquema["anchos"])
+}
+
+EPOCA = datetime(1970, 1, 1)
+
+# Cada columna: (nombre, tipo, columnas_origen). Las columnas "fecha" con dos
+# orígenes unen fecha y hora ("2025-01-02" + "08:00").
+ESQUEMA_PRODUCCION = {
+    "delimitador": ",",
+    "decimal": ".",
+    "columnas": [
+        ("timestamp", "fecha", ("timestamp",)),
+        ("producto", "cat", ("producto",)),
+        ("product_id", "cat", ("product_id",)),
+        ("estacion", "cat", ("estacion",)),
+        ("duracion_min", "real", ("duracion_min",)),
+        ("espera_min", "real", ("espera_min",)),
+        ("intento_numero", "entero", ("intento_numero",)),
+        ("estado_calidad", "cat", ("estado_calidad",)),
+    ],
+    "indices": ["product_id", "estacion"],
+    "orden": "timestamp",
+}
+
+ESQUEMA_FALLAS = {
+    "delimitador": ";",
+    "decimal": ",",
+    "columnas": [
+        ("falla_id", "texto", ("falla_id",)),
+        ("estacion", "cat", ("estacion",)),
+        ("inicio", "fecha", ("fecha_falla", "hora_falla")),
+        ("fin", "fecha", ("fecha_reparacion", "hora_reparacion")),
+        ("duracion_horas", "real", ("duracion_horas",)),
+        ("tipo_falla", "cat", ("tipo_falla",)),
+    ],
+    "indices": ["estacion"],
+    "orden": "inicio",
+    "anchos": {"falla_id": 16},
+}
+
+# ---------------------------
+# CONVERSIÓN DE VALORES
+# ---------------------------
+def a_segundos(dt):
+    """Convierte un datetime a segundos enteros desde EPOCA."""
+    return (dt - EPOCA) // timedelta(seconds=1)
+
+def desde_segundos(segundos):
+    """Convierte segundos desde EPOCA a datetime."""
+    return EPOCA + timedelta(seconds=segundos)
+
+def _conversor_fechas():
+    """
+    Devuelve una función texto -> segundos para "YYYY-MM-DD[ HH:MM[:SS]]".
+    Cachea el día (los logs repiten muchas veces la misma fecha) y evita
+    strptime en el camino común.
+    """
+    dias = {}
+
+    def convertir(texto):
+        dia = texto[:10]
+        base = dias.get(dia)
+        if base is None:
+            try:
+                base = a_segundos(datetime.strptime(dia, "%Y-%m-%d"))
+            except ValueError:
+                raise ValueError(f"Fecha inválida: {texto!r} (use YYYY-MM-DD HH:MM[:SS])")
+            dias[dia] = base
+        n = len(texto)
+        if n == 10:
+            return base
+        if n == 16:
+            return base + int(texto[11:13]) * 3600 + int(texto[14:16]) * 60
+        if n == 19:
+            return base + int(texto[11:13]) * 3600 + int(texto[14:16]) * 60 + int(texto[17:19])
+        return a_segundos(datetime.fromisoformat(texto))
+
+    return convertir
+
+def codificar(valores, codigos, categorias):
+    """Asigna (y registra si hace falta) el código de cada valor categórico."""
+    salida = []
+    agregar = salida.append
+    for v in valores:
+        c = codigos.get(v)
+        if c is None:
+            c = codigos[v] = len(categorias)
+            categorias.append(v)
+        agregar(c)
+    return salida
+
+def codificar_texto(valores, ancho):
+    """
+    Textos de ancho fijo (identificadores únicos por fila, donde un diccionario
+    de categorías no ahorra nada): `ancho` bytes UTF-8 por valor, rellenos con NUL.
+    """
+    return array.array("B", b"".join(v.encode("utf-8")[:ancho].ljust(ancho, b"\0") for v in valores))
+
+# ---------------------------
+# FORMATO COLUMNAR EN DISCO
+# ---------------------------
+def _escribir_atomico(ruta, datos):
+    """
+    Escribe un archivo vía temporal + os.replace (nunca queda a medio escribir).
+    No reemplazar así archivos mapeados por otra tabla: en Windows os.replace
+    falla con PermissionError; por eso las cachés se escriben en directorios nuevos.
+    """
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        if isinstance(datos, array.array):
+            datos.tofile(f)
+        else:
+            f.write(datos)
+    os.replace(tmp, ruta)
+
+def escribir_columnar(directorio, columnas, categorias=None, extra=None, anchos=None):
+    """
+    Guarda columnas tipadas en `directorio`: un `<nombre>.bin` por columna
+    (bytes crudos de array.array) y un `meta.json` con tipos, categorías,
+    anchos de las columnas de texto fijo (ver codificar_texto) y número de filas. El meta.json se escribe al final, así una caché a medio
+    escribir nunca se considera válida.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    categorias = categorias or {}
+    anchos = anchos or {}
+    filas = 0
+    for nombre, datos in columnas.items():
+        filas = len(datos) // anchos.get(nombre, 1)
+        break
+
+    meta = {"version": VERSION_CACHE, "filas": filas, "columnas": {}}
+    for nombre, datos in columnas.items():
+        _escribir_atomico(os.path.join(directorio, nombre + ".bin"), datos)
+        info = {"tipo": datos.typecode, "largo": len(datos)}
+        if nombre in categorias:
+            info["categorias"] = categorias[nombre]
+        if nombre in anchos:
+            info["ancho"] = anchos[nombre]
+        meta["columnas"][nombre] = info
+    meta.update(extra or {})
+
+    _escribir_atomico(os.path.join(directorio, "meta.json"),
+                      json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    return meta
+
+def leer_meta(directorio):
+    """Lee el meta.json de una caché columnar; None si no existe o está corrupto."""
+    try:
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != VERSION_CACHE:
+        return None
+    return meta
+
+def _mapear(ruta, tipo, largo):
+    """Abre un .bin como memoryview tipado respaldado por mmap."""
+    if largo == 0:
+        return memoryview(array.array(tipo))
+    with open(ruta, "rb") as f:
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(m).cast(tipo)
+
+class TablaColumnar:
+    """
+    Tabla de solo lectura sobre una caché columnar mapeada en memoria.
+    Las columnas categóricas se guardan como códigos y las de fecha como
+    segundos desde EPOCA; `valor` y `fila` devuelven los valores decodificados
+    (texto y datetime). `columna` devuelve siempre los valores crudos (bytes
+    de `ancho` fijo por fila en las columnas de texto).
+    Todas las columnas se mapean al crear la tabla: en POSIX la tabla sigue
+    siendo válida aunque después se borre su directorio (nueva versión o desalojo).
+    """
+
+    def __init__(self, directorio, meta=None):
+        self.directorio = directorio
+        self.meta = meta or leer_meta(directorio)
+        if self.meta is None:
+            raise ValueError(f"Caché columnar inválida o inexistente: {directorio}")
+        self.filas = self.meta["filas"]
+        self.orden = self.meta.get("orden")
+        self._fechas = set(self.meta.get("fechas", ()))
+        self._columnas = {
+            nombre: _mapear(os.path.join(directorio, nombre + ".bin"), info["tipo"], info["largo"])
+            for nombre, info in self.meta["columnas"].items()
+        }
+        self._codigos = {}
+
+    def __len__(self):
+        return self.filas
+
+    @property
+    def nombres(self):
+        return [n for n in self.meta["columnas"] if not n.startswith("_")]
+
+    def columna(self, nombre):
+        """Devuelve la columna cruda (memoryview tipado; códigos si es categórica)."""
+        return self._columnas[nombre]
+
+    def categorias(self, nombre):
+        return self.meta["columnas"][nombre].get("categorias")
+
+    def ancho(self, nombre):
+        return self.meta["columnas"][nombre].get("ancho")
+
+    def codigo(self, nombre, valor):
+        """Código de `valor` en la columna categórica `nombre` (None si no aparece)."""
+        mapa = self._codigos.get(nombre)
+        if mapa is None:
+            mapa = self._codigos[nombre] = {v: i for i, v in enumerate(self.categorias(nombre))}
+        return mapa.get(valor)
+
+    def valor(self, nombre, i):
+        ancho = self.ancho(nombre)
+        if ancho is not None:
+            crudo = self.columna(nombre)[i * ancho:(i + 1) * ancho]
+            return bytes(crudo).rstrip(b"\0").decode("utf-8")
+        v = self.columna(nombre)[i]
+        cats = self.categorias(nombre)
+        if cats is not None:
+            return cats[v]
+        if nombre in self._fechas:
+            return desde_segundos(v)
+        return v
+
+    def fila(self, i):
+        return {n: self.valor(n, i) for n in self.nombres}
+
+    def filas_dict(self, indices):
+        return [self.fila(i) for i in indices]
+
+    # ---- índices ----
+    def indices_por(self, nombre, valor):
+        """Filas (en orden de archivo) donde la columna categórica `nombre` == valor."""
+        clave = "_idx_" + nombre
+        if clave + "_ptr" not in self.meta["columnas"]:
+            raise KeyError(f"La columna {nombre!r} no tiene índice")
+        c = self.codigo(nombre, valor)
+        if c is None:
+            return []
+        ptr = self.columna(clave + "_ptr")
+        return self.columna(clave + "_pos")[ptr[c]:ptr[c + 1]].tolist()
+
+    def indices_en_rango(self, desde=None, hasta=None):
+        """Filas con `desde <= orden < hasta` (datetimes), ordenadas por tiempo."""
+        if self.orden is None:
+            raise KeyError("La tabla no tiene columna de orden temporal")
+        ts = self.columna(self.orden)
+        perm = self.columna("_ord_" + self.orden)
+        clave = ts.__getitem__
+        lo = 0 if desde is None else bisect.bisect_left(perm, a_segundos(desde), key=clave)
+        hi = len(perm) if hasta is None else bisect.bisect_left(perm, a_segundos(hasta), key=clave)
+        return perm[lo:hi].tolist()
+
+    def consultar(self, desde=None, hasta=None, **filtros):
+        """
+        Filtra por igualdad en columnas categóricas (p. ej. product_id=..., estacion=...)
+        y por rango de tiempo. Parte del índice más selectivo y filtra el resto
+        sobre las columnas mapeadas. Devuelve índices de fila.
+        """
+        indexados = [(n, v) for n, v in filtros.items()
+                     if "_idx_" + n + "_ptr" in self.meta["columnas"]]
+        pendientes = [(n, v) for n, v in filtros.items() if (n, v) not in indexados]
+        candidatos = None
+        for nombre, valor in indexados:
+            idx = self.indices_por(nombre, valor)
+            if candidatos is None or len(idx) < len(candidatos):
+                if candidatos is not None:
+                    pendientes.append(elegido)
+                candidatos, elegido = idx, (nombre, valor)
+            else:
+                pendientes.append((nombre, valor))
+
+        if candidatos is None:
+            if desde is not None or hasta is not None:
+                candidatos = sorted(self.indices_en_rango(desde, hasta))
+                desde = hasta = None
+            else:
+                candidatos = range(self.filas)
+
+        if desde is not None or hasta is not None:
+            ts = self.columna(self.orden)
+            lo = a_segundos(desde) if desde is not None else None
+            hi = a_segundos(hasta) if hasta is not None else None
+            candidatos = [i for i in candidatos
+                          if (lo is None or ts[i] >= lo) and (hi is None or ts[i] < hi)]
+
+        for nombre, valor in pendientes:
+            if self.ancho(nombre) is not None:
+                candidatos = [i for i in candidatos if self.valor(nombre, i) == valor]
+                continue
+            col = self.columna(nombre)
+            if self.categorias(nombre) is not None:
+                valor = self.codigo(nombre, valor)
+            candidatos = [i for i in candidatos if col[i] == valor]
+
+        return list(candidatos)
+
+# ---------------------------
+# PARSEO POR BLOQUES
+# ---------------------------
+def parsear_csv(ruta, esquema, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Parsea un CSV por bloques a columnas tipadas (array.array).
+    Devuelve (columnas, categorias).
+    """
+    columnas = {n: array.array(TIPOS[t]) for n, t, _ in esquema["columnas"]}
+    categorias = {n: [] for n, t, _ in esquema["columnas"] if t == "cat"}
+    codigos = {n: {} for n in categorias}
+    a_fecha = _conversor_fechas()
+    coma_decimal = esquema["decimal"] != "."
+
+    with open(ruta, newline="", encoding="utf-8") as f:
+        lector = csv.reader(f, delimiter=esquema["delimitador"])
+        encabezado = next(lector, None)
+        if encabezado is None:
+            return columnas, categorias
+        posicion = {nombre: i for i, nombre in enumerate(encabezado)}
+        for _, _, fuentes in esquema["columnas"]:
+            for fuente in fuentes:
+                if fuente not in posicion:
+                    raise ValueError(f"Columna {fuente!r} ausente en {ruta}")
+
+        while True:
+            bloque = list(islice(lector, tamano_bloque))
+            if not bloque:
+                break
+            transpuesto = list(zip(*bloque))
+            for nombre, tipo, fuentes in esquema["columnas"]:
+                valores = transpuesto[posicion[fuentes[0]]]
+                if len(fuentes) == 2:
+                    valores = map(" ".join, zip(valores, transpuesto[posicion[fuentes[1]]]))
+                destino = columnas[nombre]
+                if tipo == "fecha":
+                    destino.extend(map(a_fecha, valores))
+                elif tipo == "real":
+                    if coma_decimal:
+                        valores = (v.replace(",", ".") for v in valores)
+                    destino.extend(map(float, valores))
+                elif tipo == "entero":
+                    destino.extend(map(int, valores))
+                elif tipo == "texto":
+                    destino.extend(codificar_texto(valores, esquema["anchos"][nombre]))
+                else:
+                    destino.extend(codificar(valores, codigos[nombre], categorias[nombre]))
+
+    return columnas, categorias
+
+def construir_indices(columnas, categorias, esquema):
+    """
+    Agrega a `columnas` los índices del esquema:
+      _idx_<col>_ptr/_pos: posiciones de fila agrupadas por código (formato CSR)
+      _ord_<col>: permutación de filas ordenada por la columna temporal
+    """
+    for nombre in esquema.get("indices", []):
+        codigos = columnas[nombre]
+        conteo = [0] * (len(categorias[nombre]) + 1)
+        for c in codigos:
+            conteo[c + 1] += 1
+        for k in range(1, len(conteo)):
+            conteo[k] += conteo[k - 1]
+        ptr = array.array("q", conteo)
+        pos = array.array("q", bytes(8 * len(codigos)))
+        siguiente = conteo[:-1]
+        for i, c in enumerate(codigos):
+            pos[siguiente[c]] = i
+            siguiente[c] += 1
+        columnas["_idx_" + nombre + "_ptr"] = ptr
+        columnas["_idx_" + nombre + "_pos"] = pos
+
+    orden = esquema.get("orden")
+    if orden:
+        ts = columnas[orden]
+        columnas["_ord_" + orden] = array.array("q", sorted(range(len(ts)), key=ts.__getitem__))
+    return columnas
+
+# ---------------------------
+# CARGA CON CACHÉ
+# ---------------------------
+def _firma_origen(ruta):
+    st = os.stat(ruta)
+    return {"ruta": os.path.abspath(ruta), "mtime_ns": st.st_mtime_ns, "tamano": st.st_size}
+
+def directorio_cache(ruta, cache=None):
+    """
+    Directorio base de caché de un CSV (por defecto .cache_datos/<nombre> junto
+    al archivo). Contiene un subdirectorio por versión y `actual.json`, que
+    indica la versión vigente.
+    """
+    if cache is None:
+        cache = os.path.join(os.path.dirname(os.path.abspath(ruta)), DIRECTORIO_CACHE)
+    return os.path.join(cache, os.path.splitext(os.path.basename(ruta))[0])
+
+def cargar_tabla(ruta, esquema, cache=None, forzar=False):
+    """
+    Devuelve una TablaColumnar para `ruta`. Reutiliza la caché si el mtime y
+    el tamaño del CSV no cambiaron; si no, parsea y reescribe la caché.
+    """
+    base = directorio_cache(ruta, cache)
+    puntero = os.path.join(base, "actual.json")
+    firma = _firma_origen(ruta)
+
+    try:
+        with open(puntero, encoding="utf-8") as f:
+            anterior = json.load(f)["version"]
+    except (OSError, ValueError, KeyError):
+        anterior = None
+
+    if not forzar and anterior is not None:
+        directorio = os.path.join(base, anterior)
+        meta = leer_meta(directorio)
+        if meta is not None and meta.get("origen") == firma:
+            return TablaColumnar(directorio, meta)
+
+    # Versión nueva: no se tocan archivos que otras tablas puedan tener mapeados
+    version = f"v{firma['mtime_ns']}-{uuid.uuid4().hex[:8]}"
+    directorio = os.path.join(base, version)
+    columnas, categorias = parsear_csv(ruta, esquema)
+    construir_indices(columnas, categorias, esquema)
+    meta = escribir_columnar(directorio, columnas, categorias,
+                             extra={"origen": firma, "orden": esquema.get("orden"),
+                                    "fechas": [n for n, t, _ in esquema["columnas"] if t == "fecha"]},
+                             anchos=esquema.get("anchos"))
+    _escribir_atomico(puntero, json.dumps({"version": version}).encode("utf-8"))
+    _limpiar_versiones(base, (version, anterior))
+    return TablaColumnar(directorio, meta)
+
+def _limpiar_versiones(base, conservar):
+    """
+    Borra versiones viejas salvo las de `conservar` (la vigente y la anterior,
+    que otro proceso puede estar abriendo en este momento). Las que siguen
+    mapeadas en Windows no se pueden borrar y quedan para la próxima vez.
+    """
+    for e in os.scandir(base):
+        if e.is_dir() and e.name not in conservar:
+            shutil.rmtree(e.path, ignore_errors=True)
+
+def cargar_produccion(ruta="res_product.csv", cache=None, forzar=False):
+    """Carga el timeline de producción (formato de simulate_fabric.exportar_csv)."""
+    return cargar_tabla(ruta, ESQUEMA_PRODUCCION, cache, forzar)
+
+def cargar_fallas(ruta="fallas_estaciones.csv", cache=None, forzar=False):
+    """Carga el CSV de fallas (formato de simulate_available.exportar_csv)."""
+    return cargar_tabla(ruta, ESQUEMA_FALLAS, cache, forzar)
+
+# ---------------------------
+# EXPORT PARQUET (opcional)
+# ---------------------------
+def exportar_parquet(tabla, archivo):
+    """Exporta una TablaColumnar a Parquet (requiere pyarrow, importado solo aquí)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("exportar_parquet requiere pyarrow (pip install pyarrow)")
+
+    datos = {}
+    for nombre in tabla.nombres:
+        col = tabla.columna(nombre)
+        cats = tabla.categorias(nombre)
+        if cats is not None:
+            datos[nombre] = pa.DictionaryArray.from_arrays(
+                pa.array(col.tolist(), pa.int32()), pa.array(cats, pa.string()))
+        elif tabla.ancho(nombre) is not None:
+            datos[nombre] = pa.array([tabla.valor(nombre, i) for i in range(len(tabla))], pa.string())
+        elif nombre in tabla.meta.get("fechas", ()):
+            datos[nombre] = pa.array(col.tolist(), pa.timestamp("s"))
+        else:
+            datos[nombre] = pa.array(col.tolist())
+    pq.write_table(pa.table(datos), archivo)
+    print(f"Parquet generado: {archivo}")
+
+# ---------------------------
+# EJECUCIÓN
+# ---------------------------
+if __name__ == "__main__":
+    for nombre, cargar in (("res_product.csv", cargar_produccion),
+                           ("fallas_estaciones.csv", cargar_fallas)):
+        if os.path.exists(nombre):
+            tabla = cargar(nombre)
+            print(f"{nombre}: {len(tabla)} filas, columnas {tabla.nombres}")
@@ -0,0 +1,135 @@
+"""
+Exportador de fallas de estaciones (salida de simulate_available).
+Formatea números y fechas en bloque y sin locale, según un dialecto explícito
+(delimitador, separador decimal, formato de fecha/hora), y escribe con writerows.
+Incluye una salida columnar binaria compatible con cargar_datos (importado
+solo al usarla, para no cargarlo en cada import de simulate_available).
+"""
+
+import array
+import csv
+
+# ---------------------------
+# DIALECTOS
+# ---------------------------
+# Dialecto histórico de fallas_estaciones.csv (lo que consume el pbix)
+DIALECTO_FALLAS = {
+    "delimitador": ";",
+    "separador_decimal": ",",
+    "decimales": 2,
+    "formato_fecha": "%Y-%m-%d",
+    "formato_hora": "%H:%M",
+}
+
+DIALECTO_PUNTO = {
+    "delimitador": ",",
+    "separador_decimal": ".",
+    "decimales": 2,
+    "formato_fecha": "%Y-%m-%d",
+    "formato_hora": "%H:%M",
+}
+
+ENCABEZADOS_FALLAS = [
+    "falla_id",
+    "estacion",
+    "fecha_falla",
+    "hora_falla",
+    "fecha_reparacion",
+    "hora_reparacion",
+    "duracion_horas",
+    "tipo_falla"
+]
+
+def crear_dialecto(base=None, **cambios):
+    """Devuelve un dialecto nuevo a partir de `base` (DIALECTO_FALLAS por defecto)."""
+    dialecto = dict(DIALECTO_FALLAS if base is None else base)
+    for clave in cambios:
+        if clave not in DIALECTO_FALLAS:
+            raise ValueError(f"Opción de dialecto desconocida: {clave}")
+    dialecto.update(cambios)
+    return dialecto
+
+# ---------------------------
+# FORMATO EN BLOQUE
+# ---------------------------
+def formatear_decimales(numeros, separador=",", decimales=2):
+    """Formatea una secuencia de números con `decimales` fijos y el separador dado."""
+    patron = f"%.{decimales}f"
+    textos = [patron % x for x in numeros]
+    if separador != ".":
+        textos = [t.replace(".", separador) for t in textos]
+    return textos
+
+def formatear_fechas(fechas, formato):
+    """
+    Formatea una secuencia de datetimes. Los formatos habituales se resuelven
+    con f-strings (bastante más rápido que strftime); el resto usa strftime.
+    """
+    if formato == "%Y-%m-%d":
+        return [f"{d.year:04d}-{d.month:02d}-{d.day:02d}" for d in fechas]
+    if formato == "%H:%M":
+        return [f"{d.hour:02d}:{d.minute:02d}" for d in fechas]
+    if formato == "%Y-%m-%d %H:%M:%S":
+        return [f"{d.year:04d}-{d.month:02d}-{d.day:02d} {d.hour:02d}:{d.minute:02d}:{d.second:02d}"
+                for d in fechas]
+    return [d.strftime(formato) for d in fechas]
+
+def filas_fallas(fallas, dialecto=None):
+    """Construye las filas de salida columna por columna y las une con zip."""
+    dialecto = dialecto or DIALECTO_FALLAS
+    fecha, hora = dialecto["formato_fecha"], dialecto["formato_hora"]
+
+    inicios = [f["fecha_falla"] for f in fallas]
+    fines = [f["fecha_reparacion"] for f in fallas]
+    duraciones = formatear_decimales(
+        [f["duracion_horas"] for f in fallas],
+        dialecto["separador_decimal"], dialecto["decimales"]
+    )
+
+    return zip(
+        [f["falla_id"] for f in fallas],
+        [f["estacion"] for f in fallas],
+        formatear_fechas(inicios, fecha),
+        formatear_fechas(inicios, hora),
+        formatear_fechas(fines, fecha),
+        formatear_fechas(fines, hora),
+        duraciones,
+        [f["tipo_falla"] for f in fallas],
+    )
+
+# ---------------------------
+# EXPORTACIÓN
+# ---------------------------
+def exportar_fallas_csv(fallas, archivo="fallas_estaciones.csv", dialecto=None):
+    """Escribe las fallas como CSV en el dialecto indicado."""
+    dialecto = dialecto or DIALECTO_FALLAS
+    with open(archivo, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=dialecto["delimitador"])
+        writer.writerow(ENCABEZADOS_FALLAS)
+        writer.writerows(filas_fallas(fallas, dialecto))
+
+def exportar_fallas_columnar(fallas, directorio):
+    """
+    Escribe las fallas en el formato columnar binario de cargar_datos
+    (abrir luego con cargar_datos.TablaColumnar(directorio)).
+    falla_id es único por fila: va como texto de ancho fijo, no como categoría.
+    """
+    from cargar_datos import (ESQUEMA_FALLAS, a_segundos, codificar, codificar_texto,
+                              construir_indices, escribir_columnar)
+
+    categorias = {"estacion": [], "tipo_falla": []}
+    anchos = ESQUEMA_FALLAS["anchos"]
+    columnas = {"falla_id": codificar_texto((f["falla_id"] for f in fallas), anchos["falla_id"])}
+    for nombre in categorias:
+        columnas[nombre] = array.array("i", codificar(
+            (f[nombre] for f in fallas), {}, categorias[nombre]))
+    columnas["inicio"] = array.array("q", [a_segundos(f["fecha_falla"]) for f in fallas])
+    columnas["fin"] = array.array("q", [a_segundos(f["fecha_reparacion"]) for f in fallas])
+    columnas["duracion_horas"] = array.array("d", [f["duracion_horas"] for f in fallas])
+    columnas["dias_desde_ultima_falla"] = array.array(
+        "d", [f["dias_desde_ultima_falla"] for f in fallas])
+
+    construir_indices(columnas, categorias, ESQUEMA_FALLAS)
+    return escribir_columnar(directorio, columnas, categorias,
+                             extra={"orden": ESQUEMA_FALLAS["orden"], "fechas": ["inicio", "fin"]},
+                             anchos=anchos)
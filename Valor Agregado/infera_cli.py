@@ -0,0 +1,175 @@
+"""
+Línea de comandos de los simuladores de Valor Agregado.
+
+    python infera_cli.py simulate  [--seed N] [--turnos 2_turnos] [--buffers JSON] [--salida CSV]
+    python infera_cli.py failures  [--seed N] [--delimitador ;] [--decimal ,] [--columnar DIR]
+    python infera_cli.py failures  --escenario N [--turnos 2_turnos]
+    python infera_cli.py stats     TIMELINE.csv
+    python infera_cli.py export    ARCHIVO.csv [--parquet SALIDA]
+    python infera_cli.py bench     [--replicas N]
+
+Cada subcomando importa solo lo que usa (simpy únicamente en simulate/bench),
+para que las invocaciones cortas de barridos y pruebas arranquen rápido.
+"""
+
+import argparse
+import sys
+
+# ---------------------------
+# SUBCOMANDOS
+# ---------------------------
+def cmd_simulate(args):
+    import json
+    import random
+    import simulate_fabric as sf
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.turnos:
+        sf.PATRON_TURNOS = args.turnos
+    buffers = json.loads(args.buffers) if args.buffers else None
+
+    metricas = {}
+    log = sf.run_simulacion(metricas=metricas, buffers=buffers)
+    if args.salida != "-":
+        sf.exportar_csv(log, args.salida)
+    if not args.silencioso:
+        sf.generar_estadisticas_detalladas(log)
+        sf.reporte_recursos(metricas)
+        sf.reporte_buffers(metricas)
+
+def cmd_failures(args):
+    import random
+    import simulate_available as sa
+
+    if args.turnos:
+        sa.PATRON_TURNOS = args.turnos
+    if args.escenario is not None:
+        import cache_escenarios
+        tabla = cache_escenarios.obtener_escenario(args.escenario)
+        print(f"Escenario {args.escenario}: {len(tabla)} fallas en {tabla.directorio}")
+        return
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    fallas = sa.simular_todas_fallas()
+
+    if args.columnar:
+        from exportar_fallas import exportar_fallas_columnar
+        exportar_fallas_columnar(fallas, args.columnar)
+        print(f"Columnar generado: {args.columnar}")
+    salida = args.salida or "fallas_estaciones.csv"
+    if salida != "-":
+        from exportar_fallas import crear_dialecto
+        dialecto = crear_dialecto(delimitador=args.delimitador,
+                                  separador_decimal=args.decimal,
+                                  formato_fecha=args.formato_fecha,
+                                  formato_hora=args.formato_hora)
+        sa.exportar_csv(fallas, salida, dialecto)
+
+def cmd_stats(args):
+    import simulate_fabric as sf
+
+    sf.generar_estadisticas_detalladas(sf.leer_csv(args.archivo))
+
+def cmd_export(args):
+    import cargar_datos
+
+    es_fallas = args.tipo == "fallas" or (args.tipo is None and "falla" in args.archivo.lower())
+    cargar = cargar_datos.cargar_fallas if es_fallas else cargar_datos.cargar_produccion
+    tabla = cargar(args.archivo, forzar=args.forzar)
+    print(f"{args.archivo}: {len(tabla)} filas en caché columnar {tabla.directorio}")
+    if args.parquet:
+        cargar_datos.exportar_parquet(tabla, args.parquet)
+
+def cmd_bench(args):
+    import random
+    import time
+
+    t = time.perf_counter()
+    import simulate_fabric as sf
+    import simulate_available as sa
+    importacion = time.perf_counter() - t
+
+    tiempos_sim = []
+    for r in range(args.replicas):
+        random.seed(r)
+        t = time.perf_counter()
+        sf.run_simulacion()
+        tiempos_sim.append(time.perf_counter() - t)
+
+    tiempos_fallas = []
+    for r in range(args.replicas):
+        random.seed(r)
+        t = time.perf_counter()
+        sa.simular_todas_fallas()
+        tiempos_fallas.append(time.perf_counter() - t)
+
+    print(f"Importación de simuladores: {importacion*1000:.1f} ms")
+    for nombre, tiempos in (("simulate", tiempos_sim), ("failures", tiempos_fallas)):
+        print(f"{nombre}: {args.replicas} réplicas, promedio {sum(tiempos)/len(tiempos)*1000:.1f} ms, "
+              f"mín {min(tiempos)*1000:.1f} ms, máx {max(tiempos)*1000:.1f} ms")
+
+# ---------------------------
+# PARSER
+# ---------------------------
+def crear_parser():
+    # calendario_turnos no tiene dependencias pesadas: se importa para validar --turnos
+    from calendario_turnos import PATRONES_TURNO
+    turnos = sorted(PATRONES_TURNO)
+
+    parser = argparse.ArgumentParser(prog="infera_cli", description="Simuladores de Valor Agregado")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("simulate", help="simulación de producción (simulate_fabric)")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--turnos", choices=turnos, help="patrón de calendario_turnos.PATRONES_TURNO")
+    p.add_argument("--buffers", help='capacidad de buffers en JSON, ej. \'{"Tratamiento Térmico": 40}\'')
+    p.add_argument("--salida", default="timeline_produccion.csv", help="CSV de salida ('-' para no exportar)")
+    p.add_argument("--silencioso", action="store_true", help="no imprimir reportes")
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("failures", help="simulación de fallas (simulate_available)")
+    semilla = p.add_mutually_exclusive_group()
+    semilla.add_argument("--seed", type=int)
+    semilla.add_argument("--escenario", type=int,
+                         help="generar/reutilizar el escenario cacheado con esta semilla "
+                              "(admite --turnos; no exporta CSV ni columnar)")
+    p.add_argument("--turnos", choices=turnos, help="patrón de calendario_turnos.PATRONES_TURNO")
+    p.add_argument("--salida", help="CSV de salida, por defecto fallas_estaciones.csv ('-' para no exportar)")
+    p.add_argument("--delimitador", default=";")
+    p.add_argument("--decimal", default=",")
+    p.add_argument("--formato-fecha", default="%Y-%m-%d")
+    p.add_argument("--formato-hora", default="%H:%M")
+    p.add_argument("--columnar", help="directorio para la salida columnar binaria")
+    p.set_defaults(func=cmd_failures)
+
+    p = sub.add_parser("stats", help="reporte de calidad de un timeline exportado")
+    p.add_argument("archivo", nargs="?", default="res_product.csv")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("export", help="caché columnar (y Parquet opcional) de un CSV")
+    p.add_argument("archivo")
+    p.add_argument("--tipo", choices=["produccion", "fallas"])
+    p.add_argument("--parquet", help="archivo Parquet de salida (requiere pyarrow)")
+    p.add_argument("--forzar", action="store_true", help="reconstruir la caché")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("bench", help="tiempos de importación y de réplicas")
+    p.add_argument("--replicas", type=int, default=5)
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "escenario", None) is not None and (args.salida or args.columnar):
+        parser.error("--escenario no admite --salida ni --columnar: el escenario queda en la caché")
+    args.func(args)
+
+# ---------------------------
+# EJECUCIÓN
+# ---------------------------
+if __name__ == "__main__":
+    sys.exit(main())
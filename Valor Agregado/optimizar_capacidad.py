@@ -0,0 +1,279 @@
+"""
+Optimización por simulación de la capacidad por estación (tercer campo de PROCESOS)
+y del tamaño de los buffers de entrada (BUFFERS de simulate_fabric).
+Genera candidatos dentro de un presupuesto, los evalúa con números
+aleatorios comunes (la réplica j usa la misma semilla en todos los candidatos)
+en procesos paralelos, y descarta por carreras (racing) los candidatos
+dominados con pocas réplicas. Reporta el frente de Pareto costo vs throughput.
+"""
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# ---------------------------
+# CONFIGURACIÓN (ajusta aquí)
+# ---------------------------
+# Costo por unidad de capacidad (millones COP por máquina/puesto)
+COSTO_UNIDAD_CAPACIDAD = {
+    "Corte Material": 60,
+    "Mecanizado Rueda": 150,
+    "Mecanizado Piñón": 150,
+    "Cilindrado Material": 120,
+    "CNC Dientes Rueda": 280,
+    "Tallado Piñón": 220,
+    "Torneado Tornillo Sinfín": 180,
+    "Fresado Cuñero": 110,
+    "Tratamiento Térmico": 12,    # por puesto en el horno
+    "Rectificado Dientes": 200,
+    "Inspección Software": 90,
+    "Ensamblaje": 40,
+    "Inspección Final": 35,
+}
+COSTO_UNIDAD_DEFECTO = 100
+
+# Costo por lugar de buffer (espacio en planta); un buffer ilimitado (None) no suma
+COSTO_UNIDAD_BUFFER = 1
+
+# Presupuesto como múltiplo del costo de la configuración actual (None = sin límite)
+FACTOR_PRESUPUESTO = 1.3
+
+# Paso de capacidad por estación al generar candidatos (defecto 1). Los
+# candidatos suben o bajan la capacidad actual, con mínimo 1.
+PASO_CAPACIDAD = {
+    "Tratamiento Térmico": 10,
+}
+
+# Tamaños de buffer a explorar por estación (None = ilimitado). Estaciones
+# ausentes conservan el buffer de simulate_fabric.BUFFERS.
+# Ej: {"Tratamiento Térmico": [None, 20, 40], "Rectificado Dientes": [5, 10]}
+BUFFERS_BUSQUEDA = {}
+
+# Objetivos opcionales: el mejor candidato es el de menor costo que los cumple.
+# La carrera compara las métricas con objetivo (throughput si no hay ninguno).
+THROUGHPUT_OBJETIVO = None     # unidades / hora laborable
+LEAD_TIME_OBJETIVO = None      # minutos laborables promedio hasta completar
+
+N_CANDIDATOS = 24
+REPLICAS_INICIALES = 3
+REPLICAS_POR_RONDA = 2
+REPLICAS_MAXIMAS = 11
+T_CARRERA = 2.0            # cuantil para descartar (diferencia pareada / error estándar)
+SEMILLA_BASE = 12345       # semilla de la réplica 0 (números aleatorios comunes)
+SEMILLA_BUSQUEDA = 7
+WORKERS = None             # None = os.cpu_count()
+
+# ---------------------------
+# EVALUACIÓN (se ejecuta en los workers)
+# ---------------------------
+def evaluar(candidato, semilla):
+    """
+    Corre una réplica del candidato ({"capacidades": ..., "buffers": ...}) y
+    devuelve (throughput, lead_time_promedio, completados).
+    Cada unidad usa su propio generador derivado de `semilla`, así la misma
+    réplica recibe las mismas muestras en todos los candidatos.
+    """
+    import simulate_fabric
+
+    metricas = {}
+    log = simulate_fabric.run_simulacion(capacidades=candidato["capacidades"], metricas=metricas,
+                                         buffers=candidato["buffers"], semilla=semilla)
+
+    calendario = simulate_fabric.obtener_calendario()
+    completados = 0
+    suma_lead = 0.0
+    for fila in log:
+        if fila[7] == "COMPLETADO":
+            completados += 1
+            suma_lead += calendario.trabajo_hasta(datetime.fromisoformat(fila[0]))
+
+    horas = metricas["fin_min"] / 60
+    throughput = completados / horas if horas > 0 else 0.0
+    lead = suma_lead / completados if completados else math.inf
+    return throughput, lead, completados
+
+# ---------------------------
+# CANDIDATOS Y COSTOS
+# ---------------------------
+def capacidades_actuales(procesos):
+    caps = {}
+    for plist in procesos.values():
+        for est, _, cap, _ in plist:
+            caps.setdefault(est, cap)
+    return caps
+
+def costo(candidato):
+    capacidad = sum(cap * COSTO_UNIDAD_CAPACIDAD.get(est, COSTO_UNIDAD_DEFECTO)
+                    for est, cap in candidato["capacidades"].items())
+    buffers = sum(b for b in candidato["buffers"].values() if b is not None)
+    return capacidad + buffers * COSTO_UNIDAD_BUFFER
+
+def _clave_candidato(candidato):
+    return (tuple(sorted(candidato["capacidades"].items())),
+            tuple(sorted(candidato["buffers"].items())))
+
+def generar_candidatos(base, presupuesto, n, rng):
+    """
+    Base + n candidatos aleatorios sin pasar el presupuesto: suben o bajan la
+    capacidad de algunas estaciones (mínimo 1) y eligen tamaños de buffer de
+    BUFFERS_BUSQUEDA.
+    """
+    estaciones = sorted(base["capacidades"])
+    con_buffer = sorted(BUFFERS_BUSQUEDA)
+    vistos = {_clave_candidato(base)}
+    candidatos = [base]
+    intentos = 0
+    while len(candidatos) < n + 1 and intentos < n * 50:
+        intentos += 1
+        caps = dict(base["capacidades"])
+        for est in rng.sample(estaciones, rng.randint(1, min(3, len(estaciones)))):
+            paso = PASO_CAPACIDAD.get(est, 1) * rng.choice((-2, -1, 1, 2))
+            caps[est] = max(1, caps[est] + paso)
+        buffers = dict(base["buffers"])
+        for est in rng.sample(con_buffer, rng.randint(0, len(con_buffer))):
+            buffers[est] = rng.choice(BUFFERS_BUSQUEDA[est])
+        cand = {"capacidades": caps, "buffers": buffers}
+        if _clave_candidato(cand) in vistos or (presupuesto is not None and costo(cand) > presupuesto):
+            continue
+        vistos.add(_clave_candidato(cand))
+        candidatos.append(cand)
+    return candidatos
+
+# ---------------------------
+# CARRERAS
+# ---------------------------
+def _domina_significativo(xj, xi, t):
+    """True si la métrica de j es mayor que la de i con diferencia pareada significativa."""
+    d = [a - b for a, b in zip(xj, xi)]
+    n = len(d)
+    media = sum(d) / n
+    if n < 2:
+        return False
+    var = sum((x - media) ** 2 for x in d) / (n - 1)
+    return media - t * math.sqrt(var / n) > 0
+
+def metricas_carrera():
+    """
+    Índices en el resultado de evaluar de las métricas que decide la carrera y
+    su signo (+1 mayor es mejor): las que tienen objetivo, o throughput si no hay.
+    """
+    metricas = []
+    if THROUGHPUT_OBJETIVO is not None or LEAD_TIME_OBJETIVO is None:
+        metricas.append((0, 1))
+    if LEAD_TIME_OBJETIVO is not None:
+        metricas.append((1, -1))
+    return metricas
+
+def carrera(candidatos, executor):
+    """
+    Evalúa por rondas. Un candidato sale de la carrera si otro de costo menor
+    o igual es significativamente mejor en todas las métricas de
+    metricas_carrera (con las mismas réplicas).
+    """
+    resultados = [[] for _ in candidatos]
+    costos = [costo(c) for c in candidatos]
+    vivos = list(range(len(candidatos)))
+    replicas = 0
+    objetivo = REPLICAS_INICIALES
+
+    while vivos and replicas < REPLICAS_MAXIMAS:
+        nuevas = range(replicas, min(objetivo, REPLICAS_MAXIMAS))
+        trabajos = {(i, j): executor.submit(evaluar, candidatos[i], SEMILLA_BASE + j)
+                    for i in vivos for j in nuevas}
+        for (i, j), futuro in sorted(trabajos.items()):
+            resultados[i].append(futuro.result())
+        replicas = min(objetivo, REPLICAS_MAXIMAS)
+        objetivo = replicas + REPLICAS_POR_RONDA
+
+        series = [{i: [signo * r[k] for r in resultados[i]] for i in vivos}
+                  for k, signo in metricas_carrera()]
+        descartados = {
+            i for i in vivos
+            if any(costos[j] <= costos[i]
+                   and all(_domina_significativo(x[j], x[i], T_CARRERA) for x in series)
+                   for j in vivos if j != i)
+        }
+        vivos = [i for i in vivos if i not in descartados]
+        print(f"Ronda con {replicas} réplicas: {len(vivos)} candidatos siguen")
+
+    return resultados, costos, vivos
+
+def frente_pareto(puntos):
+    """puntos: [(costo, throughput, idx)] -> no dominados (menor costo, mayor throughput)."""
+    frente = []
+    mejor_tp = -math.inf
+    for c, tp, i in sorted(puntos, key=lambda p: (p[0], -p[1])):
+        if tp > mejor_tp:
+            frente.append((c, tp, i))
+            mejor_tp = tp
+    return frente
+
+# ---------------------------
+# OPTIMIZACIÓN
+# ---------------------------
+def optimizar(procesos=None, n_candidatos=N_CANDIDATOS, workers=WORKERS):
+    import simulate_fabric
+
+    base = {"capacidades": capacidades_actuales(procesos or simulate_fabric.PROCESOS),
+            "buffers": dict(simulate_fabric.BUFFERS)}
+    presupuesto = costo(base) * FACTOR_PRESUPUESTO if FACTOR_PRESUPUESTO else None
+    candidatos = generar_candidatos(base, presupuesto, n_candidatos, random.Random(SEMILLA_BUSQUEDA))
+    print(f"Candidatos: {len(candidatos)} (presupuesto: {presupuesto})")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        resultados, costos, vivos = carrera(candidatos, executor)
+
+    resumen = []
+    for i in vivos:
+        n = len(resultados[i])
+        tp = sum(r[0] for r in resultados[i]) / n
+        lead = sum(r[1] for r in resultados[i]) / n
+        resumen.append({"idx": i, "capacidades": candidatos[i]["capacidades"],
+                        "buffers": candidatos[i]["buffers"], "costo": costos[i],
+                        "throughput": tp, "lead_time": lead, "replicas": n})
+
+    frente = frente_pareto([(r["costo"], r["throughput"], k) for k, r in enumerate(resumen)])
+    frente = [resumen[k] for _, _, k in frente]
+
+    # El mejor se elige entre todos los sobrevivientes: con objetivo de lead time
+    # puede haber un candidato más barato que cumple y no está en el frente
+    cumplen = [r for r in resumen
+               if (THROUGHPUT_OBJETIVO is None or r["throughput"] >= THROUGHPUT_OBJETIVO)
+               and (LEAD_TIME_OBJETIVO is None or r["lead_time"] <= LEAD_TIME_OBJETIVO)]
+    if THROUGHPUT_OBJETIVO is None and LEAD_TIME_OBJETIVO is None:
+        mejor = max(resumen, key=lambda r: r["throughput"]) if resumen else None
+    else:
+        mejor = min(cumplen, key=lambda r: r["costo"]) if cumplen else None
+
+    imprimir_reporte(base, frente, mejor)
+    return frente, mejor
+
+def _cambios(r, base):
+    """Capacidades y buffers del candidato que difieren de la configuración actual."""
+    cambios = {e: c for e, c in r["capacidades"].items() if c != base["capacidades"][e]}
+    cambios.update({f"buffer {e}": b for e, b in r["buffers"].items()
+                    if b != base["buffers"].get(e)})
+    return cambios
+
+def imprimir_reporte(base, frente, mejor):
+    print("\n" + "="*60)
+    print("FRENTE DE PARETO: COSTO VS THROUGHPUT")
+    print("="*60)
+    for r in frente:
+        print(f"Costo {r['costo']:.0f} | {r['throughput']:.3f} u/h | "
+              f"lead {r['lead_time']:.0f} min | n={r['replicas']} | {_cambios(r, base) or 'actual'}")
+    print("-"*60)
+    if mejor is None:
+        print("Ningún candidato cumple los objetivos.")
+    else:
+        print(f"Mejor: costo {mejor['costo']:.0f}, {mejor['throughput']:.3f} u/h, "
+              f"cambios {_cambios(mejor, base) or 'ninguno'}")
+    print("="*60)
+
+# ---------------------------
+# EJECUCIÓN
+# ---------------------------
+if __name__ == "__main__":
+    optimizar()
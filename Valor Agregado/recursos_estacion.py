@@ -0,0 +1,72 @@
+"""
+Recursos SimPy instrumentados para simulate_fabric.
+Separado del simulador para que importar simulate_fabric (reportes, exportes,
+CLI) no cargue simpy.
+"""
+
+import simpy
+
+from acumuladores import AcumuladorTiempo, HistogramaTiempo
+
+class RecursoEstacion(simpy.Resource):
+    """
+    simpy.Resource con estadísticas ponderadas por tiempo, actualizadas en cada
+    cambio de estado (pedido, asignación, liberación, ver también
+    `cambiar_estado`): máquinas procesando, máquinas bloqueadas, WIP
+    (cola + máquinas + piezas en control) e histograma de la cola (ocupación
+    del buffer de entrada), del que salen también el promedio y el máximo de la cola.
+    `calendario`: turnos propios de la estación (None = los de la simulación).
+    """
+
+    def __init__(self, env, capacity=1, calendario=None):
+        super().__init__(env, capacity)
+        self.calendario = calendario
+        self.retenidas = 0    # máquinas tomadas por una pieza ya procesada (bloqueo)
+        self.en_control = 0   # piezas en control de calidad tras liberar la máquina
+        self.hist_buffer = HistogramaTiempo(env.now)
+        self.ocupadas = AcumuladorTiempo(env.now)
+        self.bloqueadas = AcumuladorTiempo(env.now)
+        self.wip = AcumuladorTiempo(env.now)
+
+    def _registrar(self):
+        t = self._env.now
+        en_cola = len(self.queue)
+        en_uso = len(self.users)
+        self.hist_buffer.actualizar(t, en_cola)
+        self.ocupadas.actualizar(t, en_uso - self.retenidas)
+        self.bloqueadas.actualizar(t, self.retenidas)
+        self.wip.actualizar(t, en_uso + en_cola + self.en_control)
+
+    def cambiar_estado(self, retenidas=0, en_control=0):
+        """
+        Suma (o resta) piezas que retienen la máquina sin procesarla (blocking-
+        after-service, incluido el control hecho sobre la máquina retenida) o
+        que están en control de calidad después de liberarla.
+        """
+        self.retenidas += retenidas
+        self.en_control += en_control
+        self._registrar()
+
+    def _trigger_put(self, get_event):
+        super()._trigger_put(get_event)
+        self._registrar()
+
+    def _trigger_get(self, put_event):
+        super()._trigger_get(put_event)
+        self._registrar()
+
+    def cerrar(self, t):
+        """Cierra todos los acumuladores en `t` (fin de la corrida)."""
+        for acumulador in (self.hist_buffer, self.ocupadas, self.bloqueadas, self.wip):
+            acumulador.cerrar(t)
+
+    def resumen(self):
+        return {
+            "capacidad": self.capacity,
+            "utilizacion": self.ocupadas.promedio() / self.capacity,
+            "bloqueo": self.bloqueadas.promedio() / self.capacity,
+            "cola_promedio": self.hist_buffer.promedio(),
+            "cola_maxima": self.hist_buffer.maximo,
+            "wip_promedio": self.wip.promedio(),
+            "wip_maximo": self.wip.maximo,
+        }
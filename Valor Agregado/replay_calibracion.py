@@ -0,0 +1,227 @@
+"""
+Modo replay / calibración con timelines históricos del MES.
+Lee logs con el esquema de simulate_fabric.exportar_csv (res_product.csv) en
+streaming, ajusta por (producto, estación) la distribución del tiempo de proceso
+(normal, lognormal o gamma, por máxima verosimilitud) y la probabilidad de
+rechazo, y vuelve a correr el modelo con esos parámetros.
+La memoria usada depende del número de estaciones, no del número de filas.
+"""
+
+import csv
+import math
+import sys
+
+# ---------------------------
+# CONFIGURACIÓN
+# ---------------------------
+# Minutos de inspección que simulate_fabric suma a duracion_min en estaciones
+# que no son de inspección (se descuentan antes de ajustar)
+MINUTOS_INSPECCION = 2
+
+# Observaciones mínimas para ajustar por (producto, estación); con menos se usa
+# el ajuste agregado de la estación y, si tampoco alcanza, se deja PROCESOS
+MIN_OBSERVACIONES = 30
+
+DISTRIBUCIONES_CANDIDATAS = ("normal", "lognormal", "gamma")
+
+ESTADOS_EVALUADOS = ("APROBADO", "RECHAZADO")
+
+# ---------------------------
+# ACUMULADOR EN STREAMING
+# ---------------------------
+def nuevo_acumulador():
+    """Estadísticos suficientes (Welford sobre x y ln x) + conteo de calidad."""
+    return {
+        "n": 0, "media": 0.0, "m2": 0.0,
+        "media_log": 0.0, "m2_log": 0.0,
+        "aprobados": 0, "rechazados": 0,
+    }
+
+def acumular(acc, x, estado):
+    """Agrega una observación en O(1) tiempo y memoria."""
+    if estado == "RECHAZADO":
+        acc["rechazados"] += 1
+    else:
+        acc["aprobados"] += 1
+    if x <= 0:
+        return
+    acc["n"] += 1
+    n = acc["n"]
+    d = x - acc["media"]
+    acc["media"] += d / n
+    acc["m2"] += d * (x - acc["media"])
+    lx = math.log(x)
+    d = lx - acc["media_log"]
+    acc["media_log"] += d / n
+    acc["m2_log"] += d * (lx - acc["media_log"])
+
+def combinar(a, b):
+    """Combina dos acumuladores (fórmula de Chan) para el ajuste agregado por estación."""
+    n = a["n"] + b["n"]
+    r = nuevo_acumulador()
+    r["aprobados"] = a["aprobados"] + b["aprobados"]
+    r["rechazados"] = a["rechazados"] + b["rechazados"]
+    if n == 0:
+        return r
+    r["n"] = n
+    for media, m2 in (("media", "m2"), ("media_log", "m2_log")):
+        d = b[media] - a[media]
+        r[media] = a[media] + d * b["n"] / n
+        r[m2] = a[m2] + b[m2] + d * d * a["n"] * b["n"] / n
+    return r
+
+def acumular_log(filas, acumuladores=None):
+    """
+    Recorre filas del log (iterables de 8 campos como las que escribe
+    simulate_fabric.exportar_csv) y acumula por (producto, estacion).
+    """
+    if acumuladores is None:
+        acumuladores = {}
+    for fila in filas:
+        _, producto, _, estacion, duracion, _, _, estado = fila
+        if estado not in ESTADOS_EVALUADOS:
+            continue
+        x = float(duracion)
+        if "Inspección" not in estacion:
+            x -= MINUTOS_INSPECCION
+        clave = (producto, estacion)
+        acc = acumuladores.get(clave)
+        if acc is None:
+            acc = acumuladores[clave] = nuevo_acumulador()
+        acumular(acc, x, estado)
+    return acumuladores
+
+def acumular_archivo(archivo, acumuladores=None):
+    """Acumula un CSV del MES leyendo fila a fila (memoria acotada)."""
+    with open(archivo, newline="", encoding="utf-8") as f:
+        lector = csv.reader(f)
+        next(lector, None)
+        return acumular_log(lector, acumuladores)
+
+# ---------------------------
+# AJUSTE DE DISTRIBUCIONES
+# ---------------------------
+def _forma_gamma(media, media_log):
+    """Estimador de máxima verosimilitud aproximado de la forma (Minka) + 2 pasos de Newton."""
+    s = math.log(media) - media_log
+    if s <= 0:
+        return None
+    k = (3 - s + math.sqrt((s - 3) ** 2 + 24 * s)) / (12 * s)
+    for _ in range(2):
+        k -= (math.log(k) - _digamma(k) - s) / (1 / k - _trigamma(k))
+    return k
+
+def _digamma(x):
+    r = 0.0
+    while x < 6:
+        r -= 1 / x
+        x += 1
+    f = 1 / (x * x)
+    return r + math.log(x) - 0.5 / x - f * (1 / 12 - f * (1 / 120 - f / 252))
+
+def _trigamma(x):
+    r = 0.0
+    while x < 6:
+        r += 1 / (x * x)
+        x += 1
+    f = 1 / (x * x)
+    return r + 1 / x + f / 2 + f / x * (1 / 6 - f * (1 / 30 - f / 42))
+
+def ajustar_distribucion(acc):
+    """
+    Devuelve (tipo, p1, p2, loglik_media) de la candidata con mayor
+    log-verosimilitud media, calculada solo con los estadísticos suficientes.
+    """
+    n = acc["n"]
+    if n < 2:
+        return None
+    media, var = acc["media"], acc["m2"] / n
+    media_log, var_log = acc["media_log"], acc["m2_log"] / n
+    if var <= 1e-12:
+        return ("constante", media, 0.0, 0.0)
+
+    ajustes = []
+    if "normal" in DISTRIBUCIONES_CANDIDATAS:
+        ll = -0.5 * math.log(2 * math.pi * var) - 0.5
+        ajustes.append(("normal", media, math.sqrt(var), ll))
+    if "lognormal" in DISTRIBUCIONES_CANDIDATAS and var_log > 1e-12:
+        ll = -media_log - 0.5 * math.log(2 * math.pi * var_log) - 0.5
+        ajustes.append(("lognormal", media_log, math.sqrt(var_log), ll))
+    if "gamma" in DISTRIBUCIONES_CANDIDATAS:
+        k = _forma_gamma(media, media_log)
+        if k is not None:
+            escala = media / k
+            ll = (k - 1) * media_log - k - k * math.log(escala) - math.lgamma(k)
+            ajustes.append(("gamma", k, escala, ll))
+    return max(ajustes, key=lambda a: a[3])
+
+def calibrar(acumuladores, procesos):
+    """
+    Devuelve (procesos_calibrados, distribuciones, reporte).
+    procesos_calibrados conserva estaciones y capacidades de `procesos` y
+    reemplaza tiempo base (media observada) y probabilidad de rechazo.
+    """
+    por_estacion = {}
+    for (producto, estacion), acc in acumuladores.items():
+        por_estacion[estacion] = combinar(por_estacion.get(estacion, nuevo_acumulador()), acc)
+
+    calibrados, distribuciones, reporte = {}, {}, []
+    for producto, plist in procesos.items():
+        nueva = []
+        for est, base_t, cap, prob in plist:
+            acc = acumuladores.get((producto, est))
+            origen = "producto"
+            if acc is None or acc["n"] < MIN_OBSERVACIONES:
+                acc, origen = por_estacion.get(est), "estacion"
+            if acc is None or acc["n"] < MIN_OBSERVACIONES:
+                nueva.append((est, base_t, cap, prob))
+                reporte.append((producto, est, "sin datos", None, base_t, prob, 0))
+                continue
+
+            ajuste = ajustar_distribucion(acc)
+            evaluados = acc["aprobados"] + acc["rechazados"]
+            prob_cal = acc["rechazados"] / evaluados if evaluados else prob
+            nueva.append((est, round(acc["media"], 2), cap, prob_cal))
+            distribuciones[(producto, est)] = ajuste[:3]
+            reporte.append((producto, est, origen, ajuste, acc["media"], prob_cal, acc["n"]))
+        calibrados[producto] = nueva
+    return calibrados, distribuciones, reporte
+
+def imprimir_reporte(reporte):
+    print("\n" + "="*60)
+    print("CALIBRACIÓN CON DATOS HISTÓRICOS")
+    print("="*60)
+    for producto, est, origen, ajuste, media, prob, n in reporte:
+        if ajuste is None:
+            print(f"{producto} / {est}: {origen} (se mantiene t={media}, p={prob})")
+            continue
+        tipo, p1, p2, _ = ajuste
+        print(f"{producto} / {est}: n={n} ({origen}) {tipo}({p1:.3f}, {p2:.3f}) "
+              f"media={media:.2f} min, p_rechazo={prob:.3f}")
+    print("="*60)
+
+# ---------------------------
+# REPLAY
+# ---------------------------
+def reproducir(archivos, exportar=None):
+    """Calibra con uno o más logs históricos y vuelve a correr la simulación."""
+    import simulate_fabric
+
+    acumuladores = {}
+    for archivo in archivos:
+        acumular_archivo(archivo, acumuladores)
+    procesos, distribuciones, reporte = calibrar(acumuladores, simulate_fabric.PROCESOS)
+    imprimir_reporte(reporte)
+
+    log = simulate_fabric.run_simulacion(procesos=procesos, distribuciones=distribuciones)
+    if exportar:
+        simulate_fabric.exportar_csv(log, exportar)
+    simulate_fabric.generar_estadisticas_detalladas(log)
+    return log
+
+# ---------------------------
+# EJECUCIÓN
+# ---------------------------
+if __name__ == "__main__":
+    archivos = sys.argv[1:] or ["res_product.csv"]
+    reproducir(archivos, exportar="timeline_calibrado.csv")
@@ -4,14 +4,12 @@ Genera un CSV con fechas de falla y reparación para cada estación.
 Versión simplificada sin impresiones extensas.
 """
 
-import csv
 import random
 from datetime import datetime, timedelta
-import uuid
-import locale
 
-# Configurar locale para formato de números con comas decimales
-locale.setlocale(locale.LC_NUMERIC, 'es_ES.UTF-8')
+from calendario_turnos import calendario_compartido, patron_jornada
+
+from exportar_fallas import DIALECTO_FALLAS, exportar_fallas_csv
 
 # ---------------------------
 # CONFIGURACIÓN PRINCIPAL
@@ -88,39 +86,32 @@ DIAS_FERIADOS = [
     "2025-12-25"
 ]
 
+# Patrón de turnos por defecto: nombre de calendario_turnos.PATRONES_TURNO
+# o None para la jornada única HORA_INICIO_JORNADA..HORA_FIN_JORNADA
+PATRON_TURNOS = None
+
+# Patrón de turnos por estación (sobrescribe PATRON_TURNOS)
+# Ej: {"Tratamiento Térmico": "3_turnos"}
+PATRON_TURNOS_POR_ESTACION = {}
+
 # ---------------------------
 # FUNCIONES AUXILIARES
 # ---------------------------
-def es_dia_habil(fecha):
-    """Devuelve True si la fecha es día hábil."""
-    if fecha.weekday() in DIAS_NO_HABILES:
-        return False
-    fecha_str = fecha.strftime("%Y-%m-%d")
-    if fecha_str in DIAS_FERIADOS:
-        return False
-    return True
-
-def siguiente_dia_habil(fecha):
-    """Devuelve la siguiente fecha hábil."""
-    fecha_temp = fecha
-    while True:
-        fecha_temp += timedelta(days=1)
-        if es_dia_habil(fecha_temp):
-            return fecha_temp
-
-def ajustar_a_horario_laboral(fecha):
+def obtener_calendario(estacion=None, origen=None):
+    """
+    Calendario de turnos de una estación desde `origen` (FECHA_INICIO por
+    defecto). Se reconstruye si cambia el origen, el patrón (PATRON_TURNOS /
+    PATRON_TURNOS_POR_ESTACION), la jornada o los feriados.
+    """
+    patron = (PATRON_TURNOS_POR_ESTACION.get(estacion) or PATRON_TURNOS
+              or patron_jornada(HORA_INICIO_JORNADA, HORA_FIN_JORNADA))
+    feriados = [datetime.strptime(d, "%Y-%m-%d").date() for d in DIAS_FERIADOS]
+    return calendario_compartido(origen or FECHA_INICIO, patron, dias_no_habiles=feriados,
+                                 dias_semana_no_habiles=DIAS_NO_HABILES)
+
+def ajustar_a_horario_laboral(fecha, estacion=None, origen=None):
     """Ajusta una fecha al horario laboral más cercano."""
-    while not es_dia_habil(fecha):
-        fecha = siguiente_dia_habil(fecha)
-        fecha = fecha.replace(hour=HORA_INICIO_JORNADA, minute=0, second=0)
-    
-    if fecha.hour < HORA_INICIO_JORNADA:
-        fecha = fecha.replace(hour=HORA_INICIO_JORNADA, minute=0, second=0)
-    elif fecha.hour >= HORA_FIN_JORNADA:
-        fecha = siguiente_dia_habil(fecha)
-        fecha = fecha.replace(hour=HORA_INICIO_JORNADA, minute=0, second=0)
-    
-    return fecha
+    return obtener_calendario(estacion, origen).ajustar(fecha)
 
 def generar_dias_hasta_falla(probabilidad_diaria):
     """Genera días hasta la próxima falla basado en probabilidad diaria."""
@@ -144,15 +135,6 @@ def generar_tiempo_reparacion(estacion, es_grave):
     tiempo = random.gauss(tiempo_base, tiempo_base * DESVIACION_REPARACION)
     return max(0.25, tiempo)
 
-def formato_decimal(numero):
-    """Formatea un número decimal con coma como separador decimal."""
-    # Usar locale para formato correcto
-    try:
-        return locale.format_string("%.2f", numero, grouping=False)
-    except:
-        # Fallback si locale no funciona
-        return f"{numero:.2f}".replace('.', ',')
-
 def simular_fallas_estacion(estacion, fecha_inicio, fecha_fin):
     """Simula fallas para una estación específica."""
     fallas = []
@@ -160,6 +142,8 @@ def simular_fallas_estacion(estacion, fecha_inicio, fecha_fin):
     
     probabilidad_diaria = PROBABILIDAD_FALLA_POR_ESTACION.get(estacion, 0.02)
     prob_falla_grave = PROBABILIDAD_FALLA_GRAVE_POR_ESTACION.get(estacion, 0.3)
+    # El calendario arranca en el inicio del horizonte (puede ser antes de FECHA_INICIO)
+    calendario = obtener_calendario(estacion, fecha_inicio)
     
     while fecha_actual < fecha_fin:
         dias_hasta_falla = generar_dias_hasta_falla(probabilidad_diaria)
@@ -168,100 +152,55 @@ def simular_fallas_estacion(estacion, fecha_inicio, fecha_fin):
         if fecha_falla >= fecha_fin:
             break
         
-        fecha_falla = ajustar_a_horario_laboral(fecha_falla)
+        fecha_falla = calendario.ajustar(fecha_falla)
         es_grave = random.random() < prob_falla_grave
         horas_reparacion = generar_tiempo_reparacion(estacion, es_grave)
-        fecha_reparacion = fecha_falla + timedelta(hours=horas_reparacion)
-        
-        # Ajustar fecha de reparación
-        while True:
-            while not es_dia_habil(fecha_reparacion):
-                fecha_reparacion = siguiente_dia_habil(fecha_reparacion)
-                fecha_reparacion = fecha_reparacion.replace(hour=HORA_INICIO_JORNADA, minute=0, second=0)
-            
-            if HORA_INICIO_JORNADA <= fecha_reparacion.hour < HORA_FIN_JORNADA:
-                break
-            else:
-                if fecha_reparacion.hour < HORA_INICIO_JORNADA:
-                    fecha_reparacion = fecha_reparacion.replace(hour=HORA_INICIO_JORNADA, minute=0, second=0)
-                else:
-                    horas_extras = (fecha_reparacion.hour - HORA_FIN_JORNADA) + (fecha_reparacion.minute / 60)
-                    fecha_reparacion = siguiente_dia_habil(fecha_reparacion)
-                    horas_enteras = int(horas_extras)
-                    minutos_enteros = int((horas_extras - horas_enteras) * 60)
-                    hora_final = HORA_INICIO_JORNADA + horas_enteras
-                    if hora_final >= HORA_FIN_JORNADA:
-                        fecha_reparacion = siguiente_dia_habil(fecha_reparacion)
-                        hora_final = HORA_INICIO_JORNADA + (hora_final - HORA_FIN_JORNADA)
-                    fecha_reparacion = fecha_reparacion.replace(hour=hora_final, minute=minutos_enteros, second=0)
+        # La reparación consume tiempo laborable del calendario de la estación
+        fecha_reparacion = calendario.sumar_trabajo(
+            fecha_falla, horas_reparacion * 60
+        )
         
         if fecha_reparacion > fecha_fin:
             fecha_reparacion = fecha_fin
         
-        falla_id = f"{estacion[:3].upper()}-{str(uuid.uuid4())[:6].upper()}"
+        # Sale del mismo random que el resto: la misma semilla da los mismos ids
+        falla_id = f"{estacion[:3].upper()}-{random.getrandbits(24):06X}"
         tipo_falla = "GRAVE" if es_grave else "LEVE"
         
-        # Usar formato_decimal para números con comas
-        duracion_formateada = formato_decimal(horas_reparacion)
-        
+        # Valores numéricos crudos: el formato se aplica en bloque al exportar
         fallas.append({
             "falla_id": falla_id,
             "estacion": estacion,
             "fecha_falla": fecha_falla,
             "fecha_reparacion": fecha_reparacion,
-            "duracion_horas": duracion_formateada,
+            "duracion_horas": horas_reparacion,
             "tipo_falla": tipo_falla,
-            "dias_desde_ultima_falla": formato_decimal(dias_hasta_falla)
+            "dias_desde_ultima_falla": dias_hasta_falla
         })
         
         fecha_actual = fecha_reparacion
     
     return fallas
 
-def simular_todas_fallas():
-    """Simula fallas para todas las estaciones."""
+def simular_todas_fallas(fecha_inicio=None, fecha_fin=None):
+    """Simula fallas para todas las estaciones (horizonte FECHA_INICIO..FECHA_FIN por defecto)."""
+    fecha_inicio = fecha_inicio or FECHA_INICIO
+    fecha_fin = fecha_fin or FECHA_FIN
     todas_fallas = []
     
     for estacion in PROBABILIDAD_FALLA_POR_ESTACION:
-        fallas_estacion = simular_fallas_estacion(estacion, FECHA_INICIO, FECHA_FIN)
+        fallas_estacion = simular_fallas_estacion(estacion, fecha_inicio, fecha_fin)
         todas_fallas.extend(fallas_estacion)
     
     return todas_fallas
 
-def exportar_csv(fallas, archivo="fallas_estaciones.csv"):
-    """Exporta las fallas a un archivo CSV con punto y coma como separador."""
+def exportar_csv(fallas, archivo="fallas_estaciones.csv", dialecto=None):
+    """Exporta las fallas a un archivo CSV (por defecto punto y coma y coma decimal)."""
     if not fallas:
         print("No se generaron fallas para exportar.")
         return
     
-    with open(archivo, "w", newline="", encoding="utf-8") as f:
-        # Usar punto y coma como delimitador y comas como separador decimal
-        writer = csv.writer(f, delimiter=';')
-        
-        # Encabezados simplificados
-        writer.writerow([
-            "falla_id",
-            "estacion",
-            "fecha_falla",
-            "hora_falla",
-            "fecha_reparacion",
-            "hora_reparacion",
-            "duracion_horas",
-            "tipo_falla"
-        ])
-        
-        # Datos - ya están formateados con comas decimales
-        for falla in fallas:
-            writer.writerow([
-                falla["falla_id"],
-                falla["estacion"],
-                falla["fecha_falla"].strftime("%Y-%m-%d"),
-                falla["fecha_falla"].strftime("%H:%M"),
-                falla["fecha_reparacion"].strftime("%Y-%m-%d"),
-                falla["fecha_reparacion"].strftime("%H:%M"),
-                falla["duracion_horas"],  # Ya formateado con coma
-                falla["tipo_falla"]
-            ])
+    exportar_fallas_csv(fallas, archivo, dialecto or DIALECTO_FALLAS)
     
     print(f"CSV generado: {archivo}")
     print(f"Total de fallas registradas: {len(fallas)}")
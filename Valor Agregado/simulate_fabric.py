@@ -4,11 +4,16 @@ Modificado para incluir verificación de calidad EN CADA ESTACIÓN con posibilid
 Cuando una estación de inspección rechaza, se regresa a estaciones anteriores.
 """
 
-import simpy
 import csv
 import uuid
 import random
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
+from functools import lru_cache
+
+from calendario_turnos import calendario_compartido, patron_jornada, union_compartida
+
+# simpy (y recursos_estacion, que depende de él) se importan dentro de
+# run_simulacion: reportes y exportaciones no pagan su costo de importación
 
 # ---------------------------
 # CONFIGURACIÓN (ajusta aquí)
@@ -70,10 +75,26 @@ ESTACIONES_REPROCESO_COMPLETO = {
     "Sinfín-Corona": ["Tratamiento Térmico", "Rectificado Dientes"]
 }
 
+# Capacidad del buffer de entrada por estación (unidades esperando, sin contar
+# las que están en proceso). Estaciones ausentes = buffer ilimitado.
+# Con buffer finito la estación anterior queda bloqueada con la pieza terminada
+# (blocking-after-service) hasta que haya lugar.
+# Ej: {"Tratamiento Térmico": 40, "Rectificado Dientes": 10}
+BUFFERS = {}
+
 # Horario laboral
 HORA_INICIO = 8
 HORA_FIN = 17
 
+# Patrón de turnos: nombre de calendario_turnos.PATRONES_TURNO ("2_turnos",
+# "3_turnos", ...) o None para la jornada única HORA_INICIO..HORA_FIN
+PATRON_TURNOS = None
+
+# Patrón propio por estación (las ausentes usan PATRON_TURNOS). Una estación
+# solo procesa dentro de sus turnos; fuera de ellos la pieza espera en la máquina.
+# Ej: {"Tratamiento Térmico": "3_turnos"}
+PATRON_TURNOS_POR_ESTACION = {}
+
 # Fecha base (inicio de simulación)
 FECHA_INICIAL = datetime(2025, 1, 2, HORA_INICIO, 0, 0)
 
@@ -96,6 +117,12 @@ NON_WORKING_DAYS = [
 VAR_SIGMA_PORC = 0.20  # desviación como fracción (20%)
 SEED = None            # semilla opcional
 
+# Distribuciones de tiempo de proceso calibradas con datos reales (ver
+# replay_calibracion.py). Clave (producto, estacion) o estacion -> (tipo, p1, p2)
+# con tipo "normal" (mu, sigma), "lognormal" (mu_log, sigma_log),
+# "gamma" (forma, escala) o "constante" (valor, 0). Si no hay entrada se usa normal_time.
+DISTRIBUCIONES_TIEMPO = {}
+
 # ---------------------------
 # UTILITARIOS: parsear feriados
 # ---------------------------
@@ -109,74 +136,99 @@ def parse_non_working(dates_list):
             raise ValueError(f"Formato inválido en NON_WORKING_DAYS: {ds} (use YYYY-MM-DD)")
     return s
 
-NON_WORKING_SET = parse_non_working(NON_WORKING_DAYS)
+@lru_cache(maxsize=8)
+def _parsear_no_habiles(dias):
+    return frozenset(parse_non_working(dias))
+
+def obtener_no_habiles():
+    """NON_WORKING_DAYS parseado (al primer uso, no al importar; se repite si la lista cambia)."""
+    return _parsear_no_habiles(tuple(NON_WORKING_DAYS))
+
+def __getattr__(nombre):
+    # Compatibilidad: NON_WORKING_SET sigue disponible como atributo del módulo
+    if nombre == "NON_WORKING_SET":
+        return obtener_no_habiles()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # ---------------------------
 # FUNCIONES DE TIEMPO
 # ---------------------------
-def es_dia_habil(dt_date):
-    """Devuelve True si la fecha (obj date) es día hábil (no está en NON_WORKING_SET)."""
-    return dt_date not in NON_WORKING_SET
-
-def siguiente_dia_habil(dt):
-    """Devuelve datetime del siguiente día hábil con hora = HORA_INICIO."""
-    d = dt.date()
-    # avanza día a día hasta encontrar uno habil
-    while True:
-        d = d + timedelta(days=1)
-        if es_dia_habil(d):
-            return datetime(d.year, d.month, d.day, HORA_INICIO, 0, 0)
+def _patron_planta():
+    return PATRON_TURNOS or patron_jornada(HORA_INICIO, HORA_FIN)
 
-def a_fecha_laboral(env_minutes):
+def obtener_calendario():
     """
-    Convierte tiempo simulado (minutos desde FECHA_INICIAL) a datetime "real"
-    respetando:
-      - horario laboral HORA_INICIO..HORA_FIN (minutos por día = (HORA_FIN-HORA_INICIO)*60)
-      - saltar fechas en NON_WORKING_SET (no hábiles)
+    Calendario que define el tiempo de la simulación (env.now = minutos laborables
+    de este calendario desde FECHA_INICIAL): el de la planta o, si hay
+    PATRON_TURNOS_POR_ESTACION, la unión de todos los turnos. Se reconstruye si
+    cambia PATRON_TURNOS(_POR_ESTACION), HORA_INICIO/HORA_FIN, FECHA_INICIAL o
+    NON_WORKING_DAYS (barridos en un mismo proceso).
     """
-    minutos_por_dia = (HORA_FIN - HORA_INICIO) * 60
-    cursor = FECHA_INICIAL
-    remaining = int(env_minutes)
-
-    if remaining == 0:
-        return cursor
-
-    while True:
-        if not es_dia_habil(cursor.date()):
-            cursor = siguiente_dia_habil(cursor)
-            continue
-            
-        start_of_day = cursor.replace(hour=HORA_INICIO, minute=0, second=0)
-        end_of_day = cursor.replace(hour=HORA_FIN, minute=0, second=0)
-
-        if cursor < start_of_day:
-            cursor = start_of_day
+    if PATRON_TURNOS_POR_ESTACION:
+        return union_compartida(
+            FECHA_INICIAL, [_patron_planta(), *PATRON_TURNOS_POR_ESTACION.values()],
+            dias_no_habiles=obtener_no_habiles()
+        )
+    return calendario_compartido(FECHA_INICIAL, _patron_planta(), dias_no_habiles=obtener_no_habiles())
 
-        if cursor >= end_of_day:
-            cursor = siguiente_dia_habil(cursor)
-            continue
+def calendario_estacion(estacion):
+    """
+    Calendario en que trabaja `estacion`, o None si coincide con el tiempo de
+    la simulación (sin PATRON_TURNOS_POR_ESTACION todas trabajan igual).
+    """
+    if not PATRON_TURNOS_POR_ESTACION:
+        return None
+    patron = PATRON_TURNOS_POR_ESTACION.get(estacion) or _patron_planta()
+    return calendario_compartido(FECHA_INICIAL, patron, dias_no_habiles=obtener_no_habiles())
 
-        minutos_disponibles = int((end_of_day - cursor).total_seconds() / 60)
+def fin_trabajo(calendario, inicio, minutos):
+    """
+    Instante de la simulación en que termina un trabajo de `minutos` hecho en
+    los turnos de `calendario` (ver calendario_estacion) a partir de `inicio`.
+    """
+    if calendario is None:
+        return inicio + minutos
+    eje = obtener_calendario()
+    return eje.trabajo_hasta(calendario.sumar_trabajo(eje.a_fecha(inicio), minutos))
 
-        if remaining <= minutos_disponibles:
-            result = cursor + timedelta(minutes=remaining)
-            if not es_dia_habil(result.date()):
-                cursor = siguiente_dia_habil(cursor)
-                continue
-            return result
-        else:
-            remaining -= minutos_disponibles
-            cursor = siguiente_dia_habil(cursor)
+def a_fecha_laboral(env_minutes):
+    """
+    Convierte tiempo simulado (minutos laborables desde FECHA_INICIAL) a datetime
+    "real" según el calendario de turnos (PATRON_TURNOS) y NON_WORKING_SET.
+    """
+    return obtener_calendario().a_fecha(int(env_minutes))
 
-def normal_time(mu):
+def normal_time(mu, rng=random):
     """Variación normal: μ=base, σ=mu*VAR_SIGMA_PORC, devuelve minutos enteros >=1."""
     sigma = mu * VAR_SIGMA_PORC
-    t = random.gauss(mu, sigma)
+    t = rng.gauss(mu, sigma)
     return max(1, int(round(t)))
 
-def verificar_calidad_estacion(estacion, prob_rechazo_base):
+def muestrear_tiempo(distribucion, rng=random):
+    """Muestrea un tiempo (minutos, sin redondear) de una distribución (tipo, p1, p2)."""
+    tipo, p1, p2 = distribucion
+    if tipo == "normal":
+        return rng.gauss(p1, p2)
+    if tipo == "lognormal":
+        return rng.lognormvariate(p1, p2)
+    if tipo == "gamma":
+        return rng.gammavariate(p1, p2)
+    if tipo == "constante":
+        return p1
+    raise ValueError(f"Distribución desconocida: {tipo}")
+
+def tiempo_proceso(producto, estacion, base_t, distribuciones=None, rng=random):
+    """Tiempo de proceso en minutos enteros >=1: distribución calibrada si existe, si no normal_time."""
+    if distribuciones is None:
+        distribuciones = DISTRIBUCIONES_TIEMPO
+    dist = distribuciones.get((producto, estacion)) or distribuciones.get(estacion)
+    if dist is None:
+        return normal_time(base_t, rng)
+    return max(1, int(round(muestrear_tiempo(dist, rng))))
+
+def verificar_calidad_estacion(estacion, prob_rechazo_base, rng=random):
     """Simula la verificación de calidad para una estación específica."""
-    return random.random() > prob_rechazo_base
+    return rng.random() > prob_rechazo_base
 
 def obtener_estaciones_para_reproceso(producto, estacion_actual, procesos_lista):
     """Determina qué estaciones deben reprocesarse basado en la estación actual."""
@@ -218,36 +270,66 @@ def obtener_procesos_desde_estaciones(procesos_lista, estaciones_reproceso):
 # ---------------------------
 # SIMULACIÓN SIMPY
 # ---------------------------
+def salir_de_estacion(env, recurso, req, estacion, siguiente, buffers):
+    """
+    Blocking-after-service: si la siguiente estación tiene buffer finito, la pieza
+    retiene la máquina hasta conseguir lugar allí. Devuelve la reserva del lugar (o None).
+    """
+    if buffers is None or siguiente not in buffers["areas"]:
+        return None
+    t_bloqueo = env.now
+    lugar = buffers["areas"][siguiente].request()
+    yield lugar
+    bloqueado = buffers["bloqueado_min"]
+    bloqueado[estacion] = bloqueado.get(estacion, 0.0) + (env.now - t_bloqueo)
+    recurso.cambiar_estado(retenidas=-1)
+    recurso.release(req)
+    return lugar
+
 def procesar_estacion_con_calidad(env, producto, pid, estacion, base_t, prob_rechazo, 
-                                 estaciones, log, intento_numero):
-    """Procesa una estación con verificación de calidad incorporada."""
+                                 estaciones, log, intento_numero, distribuciones=None,
+                                 siguiente=None, buffers=None, rng=random):
+    """
+    Procesa una estación con verificación de calidad incorporada.
+    Devuelve (aprobado, estacion_rechazada, lugar_en_siguiente_buffer).
+    """
     recurso = estaciones[estacion]
+    bloquea = buffers is not None and siguiente in buffers["areas"]
     intento_local = 1
     max_intentos_local = 3
     
     while intento_local <= max_intentos_local:
         # Procesar la estación
-        dur = normal_time(base_t)
+        dur = tiempo_proceso(producto, estacion, base_t, distribuciones, rng)
         
-        with recurso.request() as req:
-            t_antes = env.now
-            yield req
-            espera = env.now - t_antes
-
-            start = env.now
-            fecha_real = a_fecha_laboral(start)
-            
-            # Procesamos directamente
-            yield env.timeout(dur)
+        req = recurso.request()
+        t_antes = env.now
+        yield req
+        espera = env.now - t_antes
+
+        # El proceso avanza solo en los turnos de la estación
+        start = fin_trabajo(recurso.calendario, env.now, 0)
+        fecha_real = a_fecha_laboral(start)
+        
+        yield env.timeout(fin_trabajo(recurso.calendario, start, dur) - env.now)
+        # Con bloqueo la máquina se retiene (sin procesar) hasta que la pieza pueda salir
+        if bloquea:
+            recurso.cambiar_estado(retenidas=1)
+        else:
+            recurso.release(req)
         
         # Verificación de calidad (excepto para estaciones de inspección)
         es_inspeccion = "Inspección" in estacion
         
         if not es_inspeccion:
             # Para estaciones normales, hacer inspección de calidad
-            yield env.timeout(2)  # Tiempo para inspección
+            if not bloquea:
+                recurso.cambiar_estado(en_control=1)
+            yield env.timeout(fin_trabajo(recurso.calendario, env.now, 2) - env.now)  # Tiempo para inspección
+            if not bloquea:
+                recurso.cambiar_estado(en_control=-1)
             
-            if verificar_calidad_estacion(estacion, prob_rechazo):
+            if verificar_calidad_estacion(estacion, prob_rechazo, rng):
                 # Aprobado - registrar resultado
                 log.append([
                     fecha_real.strftime("%Y-%m-%d %H:%M:%S"),
@@ -259,7 +341,8 @@ def procesar_estacion_con_calidad(env, producto, pid, estacion, base_t, prob_rec
                     intento_numero,
                     "APROBADO"
                 ])
-                return True, None  # Aprobado, continuar a siguiente estación
+                lugar = yield from salir_de_estacion(env, recurso, req, estacion, siguiente, buffers)
+                return True, None, lugar  # Aprobado, continuar a siguiente estación
             else:
                 # Rechazado - registrar resultado
                 log.append([
@@ -272,15 +355,18 @@ def procesar_estacion_con_calidad(env, producto, pid, estacion, base_t, prob_rec
                     intento_numero,
                     "RECHAZADO"
                 ])
+                if bloquea:
+                    recurso.cambiar_estado(retenidas=-1)
+                    recurso.release(req)
                 intento_local += 1
                 # Si superó el máximo de intentos locales, salir
                 if intento_local > max_intentos_local:
-                    return False, estacion
+                    return False, estacion, None
                 # Continuar intentando en la misma estación
                 continue
         else:
             # Para estaciones de inspección, el resultado ya está incluido en el proceso
-            if verificar_calidad_estacion(estacion, prob_rechazo):
+            if verificar_calidad_estacion(estacion, prob_rechazo, rng):
                 # Aprobado - registrar resultado
                 log.append([
                     fecha_real.strftime("%Y-%m-%d %H:%M:%S"),
@@ -292,7 +378,8 @@ def procesar_estacion_con_calidad(env, producto, pid, estacion, base_t, prob_rec
                     intento_numero,
                     "APROBADO"
                 ])
-                return True, None
+                lugar = yield from salir_de_estacion(env, recurso, req, estacion, siguiente, buffers)
+                return True, None, lugar
             else:
                 # Rechazado - registrar resultado
                 log.append([
@@ -305,28 +392,48 @@ def procesar_estacion_con_calidad(env, producto, pid, estacion, base_t, prob_rec
                     intento_numero,
                     "RECHAZADO"
                 ])
+                if bloquea:
+                    recurso.cambiar_estado(retenidas=-1)
+                    recurso.release(req)
                 intento_local += 1
                 # Si superó el máximo de intentos locales, salir
                 if intento_local > max_intentos_local:
-                    return False, estacion
+                    return False, estacion, None
                 # Volver a procesar la inspección (nueva medición/verificación)
                 continue
     
     # Si llegamos aquí, se agotaron los intentos locales
-    return False, estacion
+    return False, estacion, None
 
 def proceso_producto(env, producto, pid, procesos_lista, estaciones, log, 
-                    intento_numero=1, max_reprocesos=3):
-    """Simula el flujo completo de UN producto con verificación en cada estación."""
+                    intento_numero=1, max_reprocesos=3, distribuciones=None, buffers=None,
+                    rng=random):
+    """
+    Simula el flujo completo de UN producto con verificación en cada estación.
+    rng: generador de la unidad (ver run_simulacion); por defecto el global.
+    """
     start_global = env.now
     
+    # Lugar ocupado en el buffer de la estación actual (solo buffers finitos)
+    lugar = None
+    primera = procesos_lista[0][0]
+    if buffers is not None and primera in buffers["areas"]:
+        lugar = buffers["areas"][primera].request()
+        yield lugar
+    
     for i, (estacion, base_t, cap, prob_rechazo) in enumerate(procesos_lista):
+        siguiente = procesos_lista[i + 1][0] if i + 1 < len(procesos_lista) else None
         # Procesar estación con verificación de calidad incorporada
-        aprobado, estacion_rechazada = yield from procesar_estacion_con_calidad(
+        aprobado, estacion_rechazada, lugar_siguiente = yield from procesar_estacion_con_calidad(
             env, producto, pid, estacion, base_t, prob_rechazo,
-            estaciones, log, intento_numero
+            estaciones, log, intento_numero, distribuciones, siguiente, buffers, rng
         )
         
+        # La pieza deja la estación: libera su lugar en el buffer
+        if lugar is not None:
+            buffers["areas"][estacion].release(lugar)
+        lugar = lugar_siguiente
+        
         if not aprobado:
             # Producto rechazado en esta estación (agotó intentos locales)
             if intento_numero < max_reprocesos:
@@ -344,7 +451,7 @@ def proceso_producto(env, producto, pid, procesos_lista, estaciones, log,
                 env.process(
                     proceso_producto(
                         env, producto, pid, procesos_reproceso, estaciones, log,
-                        intento_numero + 1, max_reprocesos
+                        intento_numero + 1, max_reprocesos, distribuciones, buffers, rng
                     )
                 )
                 return  # Terminar este proceso, el reproceso se hará en otro
@@ -376,7 +483,33 @@ def proceso_producto(env, producto, pid, procesos_lista, estaciones, log,
     ])
     return total
 
-def run_simulacion():
+def run_simulacion(procesos=None, distribuciones=None, capacidades=None, metricas=None,
+                   buffers=None, semilla=None):
+    """
+    Corre la simulación y devuelve el log.
+    procesos/distribuciones permiten sobrescribir PROCESOS y DISTRIBUCIONES_TIEMPO
+    (p. ej. con los valores calibrados por replay_calibracion).
+    capacidades: {estacion: capacidad} sobrescribe la capacidad de PROCESOS.
+    buffers: {estacion: capacidad_buffer} sobrescribe BUFFERS.
+    semilla: si se indica, cada unidad (producto, n° de orden) usa su propio
+    random.Random derivado de la semilla. Así una réplica da a cada unidad las
+    mismas muestras con cualquier capacidad o buffer (números aleatorios comunes).
+    metricas: dict opcional que se completa con métricas de la corrida
+    ("fin_min": minutos laborables simulados hasta vaciar la planta,
+    "buffers": histograma de ocupación y bloqueo por estación, "recursos":
+    utilización (máquinas procesando), bloqueo (máquinas retenidas), cola y WIP
+    ponderados por tiempo por estación, "wip_promedio": WIP de planta, es decir
+    piezas en cola, en máquina o en control en alguna estación; no cuenta las
+    que esperan lugar en el buffer finito de la primera estación, aún no liberadas).
+    """
+    import simpy
+    from recursos_estacion import RecursoEstacion
+
+    if procesos is None:
+        procesos = PROCESOS
+    if buffers is None:
+        buffers = BUFFERS
+
     if SEED is not None:
         random.seed(SEED)
 
@@ -384,28 +517,90 @@ def run_simulacion():
 
     # Crear recursos (máquinas) por nombre (compartidos si el nombre coincide)
     estaciones = {}
-    for plist in PROCESOS.values():
+    for plist in procesos.values():
         for est, t, cap, prob in plist:  # Ahora esperamos 4 valores
             if est not in estaciones:
-                estaciones[est] = simpy.Resource(env, capacity=cap)
+                if capacidades and est in capacidades:
+                    cap = capacidades[est]
+                estaciones[est] = RecursoEstacion(env, capacity=cap,
+                                                  calendario=calendario_estacion(est))
+
+    # Buffers finitos: cada "área" admite buffer + capacidad de la estación
+    estado_buffers = None
+    if buffers:
+        estado_buffers = {"areas": {}, "bloqueado_min": {}}
+        for est, cap_buffer in buffers.items():
+            if est in estaciones and cap_buffer is not None:
+                estado_buffers["areas"][est] = simpy.Resource(
+                    env, capacity=cap_buffer + estaciones[est].capacity
+                )
 
     log = []
 
     # Crear órdenes: todos los procesos arrancan en t=0 (simulación paralela)
     for producto, cantidad in ORDENES.items():
-        for _ in range(cantidad):
+        for n in range(cantidad):
             pid = str(uuid.uuid4())
             # Usar los procesos directamente (ya incluyen probabilidad)
-            procesos_lista = PROCESOS[producto]
+            procesos_lista = procesos[producto]
+            rng = random if semilla is None else random.Random(f"{semilla}|{producto}|{n}")
             
             env.process(
-                proceso_producto(env, producto, pid, procesos_lista, estaciones, log)
+                proceso_producto(env, producto, pid, procesos_lista, estaciones, log,
+                                 distribuciones=distribuciones, buffers=estado_buffers, rng=rng)
             )
 
     env.run()
 
+    if metricas is not None:
+        metricas["fin_min"] = env.now
+        bloqueado = estado_buffers["bloqueado_min"] if estado_buffers else {}
+        metricas["buffers"] = {}
+        metricas["recursos"] = {}
+        for est, recurso in estaciones.items():
+            recurso.cerrar(env.now)
+            metricas["recursos"][est] = recurso.resumen()
+            metricas["buffers"][est] = {
+                "capacidad_buffer": buffers.get(est),
+                "histograma": recurso.hist_buffer.distribucion(),
+                "bloqueado_min": bloqueado.get(est, 0.0),
+            }
+        metricas["wip_promedio"] = sum(r["wip_promedio"] for r in metricas["recursos"].values())
+
     return log
 
+def reporte_recursos(metricas):
+    """Imprime utilización, cola y WIP ponderados por tiempo por estación."""
+    print("\n" + "="*60)
+    print("UTILIZACIÓN Y COLAS POR ESTACIÓN (ponderado por tiempo)")
+    print("="*60)
+    for est, r in metricas.get("recursos", {}).items():
+        print(f"\n{est} (capacidad {r['capacidad']}):")
+        print(f"  Utilización: {r['utilizacion']*100:.1f}%  bloqueo: {r['bloqueo']*100:.1f}%")
+        print(f"  Cola promedio: {r['cola_promedio']:.2f}  máxima: {r['cola_maxima']}")
+        print(f"  WIP promedio: {r['wip_promedio']:.2f}  máximo: {r['wip_maximo']}")
+    if "wip_promedio" in metricas:
+        print(f"\nWIP promedio de planta: {metricas['wip_promedio']:.2f}")
+    print("\n" + "="*60)
+
+def reporte_buffers(metricas):
+    """Imprime ocupación de buffers (histograma ponderado por tiempo) y tiempo bloqueado."""
+    print("\n" + "="*60)
+    print("BUFFERS Y BLOQUEO POR ESTACIÓN")
+    print("="*60)
+    recursos = metricas.get("recursos", {})
+    for est, datos in metricas.get("buffers", {}).items():
+        cap = datos["capacidad_buffer"]
+        print(f"\n{est} (buffer: {'ilimitado' if cap is None else cap}):")
+        if est in recursos:
+            r = recursos[est]
+            print(f"  Ocupación promedio: {r['cola_promedio']:.2f}  máxima: {r['cola_maxima']}")
+        print(f"  Tiempo bloqueado: {datos['bloqueado_min']:.0f} min")
+        if len(datos["histograma"]) <= 15:
+            niveles = ", ".join(f"{n}: {f*100:.1f}%" for n, f in datos["histograma"].items())
+            print(f"  Histograma: {niveles}")
+    print("\n" + "="*60)
+
 # ---------------------------
 # EXPORT CSV
 # ---------------------------
@@ -426,6 +621,16 @@ def exportar_csv(log, archivo="timeline_produccion.csv"):
             writer.writerow(fila)
     print(f"CSV generado: {archivo}")
 
+def leer_csv(archivo="timeline_produccion.csv"):
+    """Lee un timeline exportado con exportar_csv y devuelve el log (mismas filas y tipos)."""
+    log = []
+    with open(archivo, newline="", encoding="utf-8") as f:
+        lector = csv.reader(f)
+        next(lector, None)
+        for ts, producto, pid, estacion, dur, espera, intento, estado in lector:
+            log.append([ts, producto, pid, estacion, float(dur), float(espera), int(intento), estado])
+    return log
+
 # ---------------------------
 # ESTADÍSTICAS DETALLADAS
 # ---------------------------
@@ -579,6 +784,9 @@ if __name__ == "__main__":
     print("NOTA: Solo columna intento_numero (sin etapa_numero).")
     print("NOTA: Cada estación se procesa hasta que sale APROBADO (máx 3 intentos por estación).")
     print("NOTA: Cuando una inspección rechaza, se regresa a estaciones anteriores.")
-    log = run_simulacion()
+    metricas = {}
+    log = run_simulacion(metricas=metricas)
     exportar_csv(log)
-    generar_estadisticas_detalladas(log)
\ No newline at end of file
+    generar_estadisticas_detalladas(log)
+    reporte_recursos(metricas)
+    reporte_buffers(metricas)
\ No newline at end of file